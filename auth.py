@@ -0,0 +1,214 @@
+import os
+import json
+import hmac
+import time
+import secrets
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+USERS_FILE = "users.json"
+SESSION_TTL = 30 * 60  # Seconds a session stays valid without being used
+HASH_ITERATIONS = 200_000
+
+# Permissions checked by StudentManager before each operation
+VIEW = 'view'
+ADD_STUDENT = 'add_student'
+REMOVE_STUDENT = 'remove_student'
+ENROLL = 'enroll'
+COMPLETE = 'complete'
+UNDO = 'undo'
+
+PERMISSIONS = {
+    'Admin': frozenset({VIEW, ADD_STUDENT, REMOVE_STUDENT, ENROLL, COMPLETE, UNDO}),
+    'Teacher': frozenset({VIEW, ENROLL, COMPLETE, UNDO}),
+    'Viewer': frozenset({VIEW})
+}
+
+# Seeded into a new user store; these are the accounts shown on the login screen
+DEFAULT_USERS = {
+    'admin': ('admin123', 'Admin'),
+    'teacher': ('teach123', 'Teacher'),
+    'viewer': ('view123', 'Viewer')
+}
+
+
+def hash_password(password: str, salt: Optional[str] = None) -> Tuple[str, str]:
+
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'),
+                                 bytes.fromhex(salt), HASH_ITERATIONS)
+    return salt, digest.hex()
+
+
+class Session:
+
+    def __init__(self, username: str, role: str, ttl: float = SESSION_TTL):
+
+        self.username = username
+        self.role = role
+        self.token = secrets.token_urlsafe(32)
+        self.ttl = ttl
+        self.expires_at = time.monotonic() + ttl
+        self.revoked = False  # Set on logout; holders of the object are refused too
+        self._permissions = PERMISSIONS.get(role, frozenset())
+
+    def can(self, permission: str) -> bool:
+
+        return permission in self._permissions
+
+    @property
+    def read_only(self) -> bool:
+
+        return not (self._permissions - {VIEW})
+
+    def is_expired(self) -> bool:
+
+        # A revoked session counts as expired, so every check that refuses
+        # expired sessions refuses logged-out ones as well
+        return self.revoked or time.monotonic() >= self.expires_at
+
+    def revoke(self) -> None:
+
+        self.revoked = True
+
+    def touch(self) -> None:
+
+        self.expires_at = time.monotonic() + self.ttl
+
+
+class AuthManager:
+
+    def __init__(self, users_file: str = USERS_FILE, session_ttl: float = SESSION_TTL):
+
+        self.users_file = users_file
+        self.session_ttl = session_ttl
+        self.users: Dict[str, Dict] = {}
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        # Compared against when the username is unknown so timing gives nothing away
+        self._dummy_salt, self._dummy_hash = hash_password(secrets.token_hex(8))
+
+        self.load_users()
+
+    def load_users(self) -> bool:
+
+        try:
+            if not os.path.exists(self.users_file):
+                self.users = {}
+                for username, (password, role) in DEFAULT_USERS.items():
+                    salt, password_hash = hash_password(password)
+                    self.users[username] = {'salt': salt, 'hash': password_hash, 'role': role}
+                self.save_users()
+                print(f"Created user store with default accounts: {self.users_file}")
+                return True
+
+            with open(self.users_file, 'r') as f:
+                self.users = json.load(f)
+            return True
+
+        except Exception as e:
+            print(f"Error loading users: {e}")
+            return False
+
+    def save_users(self) -> bool:
+
+        try:
+            with open(self.users_file, 'w') as f:
+                json.dump(self.users, f, indent=2)
+            return True
+        except Exception as e:
+            print(f"Error saving users: {e}")
+            return False
+
+    def add_user(self, username: str, password: str, role: str) -> bool:
+
+        if role not in PERMISSIONS:
+            print(f"Error: Unknown role {role}")
+            return False
+        if username in self.users:
+            print(f"Error: User {username} already exists")
+            return False
+
+        salt, password_hash = hash_password(password)
+        self.users[username] = {'salt': salt, 'hash': password_hash, 'role': role}
+        return self.save_users()
+
+    def authenticate(self, username: str, password: str) -> Optional[Session]:
+
+        # The only place a password is hashed; later requests present the token
+        user = self.users.get(username)
+        salt = user['salt'] if user else self._dummy_salt
+        expected = user['hash'] if user else self._dummy_hash
+        _, password_hash = hash_password(password, salt)
+
+        if not user or not hmac.compare_digest(password_hash, expected):
+            return None
+
+        session = Session(username, user['role'], self.session_ttl)
+        with self._lock:
+            self._sessions[session.token] = session
+        return session
+
+    def get_session(self, token: str) -> Optional[Session]:
+
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.is_expired():
+                del self._sessions[token]
+                return None
+            session.touch()
+            return session
+
+    def logout(self, token: str) -> bool:
+
+        with self._lock:
+            session = self._sessions.pop(token, None)
+        if session is None:
+            return False
+        session.revoke()
+        return True
+
+
+# Unit Tests
+if __name__ == "__main__":
+    print("Running Unit Tests for auth\n")
+    print("=" * 50)
+
+    print("\nTest 1: Default user store is created with salted hashes")
+    auth = AuthManager("test_users.json")
+    with open("test_users.json") as f:
+        stored = json.load(f)
+    assert set(stored) == set(DEFAULT_USERS)
+    assert "admin123" not in json.dumps(stored), "Password stored in plain text"
+    assert stored['admin']['salt'] != stored['teacher']['salt'], "Salts are reused"
+    print("✓ User store tests passed")
+
+    print("\nTest 2: Authentication and sessions")
+    assert auth.authenticate("admin", "wrong") is None
+    assert auth.authenticate("nobody", "admin123") is None
+    session = auth.authenticate("teacher", "teach123")
+    assert session is not None and session.role == "Teacher"
+    assert auth.get_session(session.token) is session
+    assert AuthManager("test_users.json").authenticate("viewer", "view123").read_only
+    assert auth.logout(session.token) and auth.get_session(session.token) is None
+    assert session.is_expired(), "Logged-out session still usable by its holder"
+    assert auth.logout(session.token) == False
+    short = AuthManager("test_users.json", session_ttl=0).authenticate("admin", "admin123")
+    assert short.is_expired(), "Zero TTL session should expire immediately"
+    print("✓ Session tests passed")
+
+    print("\nTest 3: Permission matrix")
+    assert session.can(ENROLL) and session.can(UNDO)
+    assert not session.can(ADD_STUDENT) and not session.can(REMOVE_STUDENT)
+    assert auth.add_user("registrar", "s3cret", "Admin")
+    assert auth.authenticate("registrar", "s3cret").can(REMOVE_STUDENT)
+    assert auth.add_user("ghost", "x", "Superuser") == False
+    print("✓ Permission tests passed")
+
+    os.remove("test_users.json")
+
+    print("\n" + "=" * 50)
+    print("All unit tests passed successfully! ✓")
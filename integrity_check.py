@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import locale
+import shutil
+import argparse
+from datetime import datetime
+from typing import List, Optional, Dict, Tuple, TextIO, BinaryIO
+
+from student_manager import Student
+
+INVALID_RECORD = 'invalid_record'
+DUPLICATE_ID = 'duplicate_id'
+MARK_COUNT_MISMATCH = 'mark_count_mismatch'
+MARK_OUT_OF_RANGE = 'mark_out_of_range'
+ENROLLED_AND_COMPLETED = 'enrolled_and_completed'
+
+
+def check_record(student: Student) -> List[Tuple[str, str]]:
+
+    issues = []
+    if len(student.subjects_marks) != len(student.subjects_completed):
+        issues.append((MARK_COUNT_MISMATCH,
+                       f"{len(student.subjects_completed)} completed subjects but "
+                       f"{len(student.subjects_marks)} marks"))
+
+    for subject, mark in zip(student.subjects_completed, student.subjects_marks):
+        if not (0 <= mark <= 100):
+            issues.append((MARK_OUT_OF_RANGE, f"{subject}: {mark}"))
+
+    completed = set(student.subjects_completed)
+    for subject in student.subjects_enrolled:
+        if subject in completed:
+            issues.append((ENROLLED_AND_COMPLETED, subject))
+
+    return issues
+
+
+def repair_record(student: Student) -> Student:
+
+    completed = student.subjects_completed[:len(student.subjects_marks)]
+    marks = [min(max(mark, 0), 100) for mark in student.subjects_marks[:len(completed)]]
+    # A completed subject with no mark is treated as still in progress
+    unmarked = student.subjects_completed[len(marks):]
+
+    done = set(completed)
+    enrolled = []
+    for subject in student.subjects_enrolled + unmarked:
+        if subject not in done and subject not in enrolled:
+            enrolled.append(subject)
+
+    return Student(student.student_id, student.student_name, enrolled, completed, marks)
+
+
+def scan(source: BinaryIO, report: TextIO, repaired: Optional[BinaryIO] = None,
+         encoding: Optional[str] = None) -> Dict:
+
+    # One pass over the file; the set of IDs seen is the only state that grows
+    encoding = encoding or locale.getpreferredencoding(False)
+    seen_ids = set()
+    counts = {issue: 0 for issue in (INVALID_RECORD, DUPLICATE_ID, MARK_COUNT_MISMATCH,
+                                     MARK_OUT_OF_RANGE, ENROLLED_AND_COMPLETED)}
+    records = 0
+    written = 0
+    offset = 0
+
+    def emit(line_number: int, line_offset: int, student_id: Optional[str], issue: str,
+             detail: str) -> None:
+        counts[issue] += 1
+        report.write(json.dumps({'line': line_number, 'offset': line_offset,
+                                 'student_id': student_id, 'issue': issue,
+                                 'detail': detail}) + '\n')
+
+    for line_number, raw in enumerate(source, start=1):
+        line_offset = offset
+        offset += len(raw)
+        try:
+            line = raw.decode(encoding).strip()
+        except UnicodeDecodeError as e:
+            emit(line_number, line_offset, None, INVALID_RECORD, str(e))
+            continue
+        if not line:
+            continue
+
+        records += 1
+        try:
+            student = Student.from_string(line)
+        except ValueError as e:
+            emit(line_number, line_offset, None, INVALID_RECORD, str(e))
+            continue
+
+        if student.student_id in seen_ids:
+            emit(line_number, line_offset, student.student_id, DUPLICATE_ID,
+                 "Later record with an ID already seen")
+            continue
+        seen_ids.add(student.student_id)
+
+        issues = check_record(student)
+        for issue, detail in issues:
+            emit(line_number, line_offset, student.student_id, issue, detail)
+
+        if repaired is not None:
+            fixed = repair_record(student) if issues else student
+            repaired.write((fixed.to_string() + '\n').encode(encoding))
+            written += 1
+
+    summary = {'records': records, 'unique_ids': len(seen_ids),
+               'issues': sum(counts.values()), 'by_issue': counts}
+    if repaired is not None:
+        summary['records_written'] = written
+    report.write(json.dumps({'summary': summary}) + '\n')
+    return summary
+
+
+def _backup(filename: str, backup_dir: str = "backups") -> str:
+
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    name = os.path.splitext(os.path.basename(filename))[0]
+    backup_filename = os.path.join(backup_dir, f"{name}_{timestamp}.txt")
+    shutil.copy2(filename, backup_filename)
+    return backup_filename
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(
+        description="Check a student data file for integrity problems and optionally repair it.")
+    parser.add_argument("filename", nargs="?", default="students.txt")
+    parser.add_argument("--report", help="write the JSON Lines report here instead of stdout")
+    repair = parser.add_mutually_exclusive_group()
+    repair.add_argument("--repair", metavar="OUTPUT",
+                        help="write a repaired copy of the data file to OUTPUT")
+    repair.add_argument("--in-place", action="store_true",
+                        help="repair the data file itself after backing it up")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.filename):
+        print(f"Error: Data file not found: {args.filename}", file=sys.stderr)
+        return 2
+
+    output = args.repair
+    if args.in_place:
+        output = args.filename + ".repairing"
+
+    report = open(args.report, 'w') if args.report else sys.stdout
+    try:
+        with open(args.filename, 'rb') as source:
+            if output:
+                with open(output, 'wb') as repaired:
+                    summary = scan(source, report, repaired)
+            else:
+                summary = scan(source, report)
+    finally:
+        if args.report:
+            report.close()
+
+    if args.in_place:
+        backup_filename = _backup(args.filename)
+        os.replace(output, args.filename)
+        print(f"Repaired {args.filename} (backup: {backup_filename})", file=sys.stderr)
+    elif output:
+        print(f"Repaired copy written to {output}", file=sys.stderr)
+
+    return 1 if summary['issues'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,20 @@
+import re
+import time
+import queue
+import bisect
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from student_manager import StudentManager, Student
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+from auth import AuthManager, Session, VIEW, ADD_STUDENT, REMOVE_STUDENT, ENROLL, COMPLETE, UNDO
+from student_manager import StudentManager, Student, RELOADED, SORT_KEYS, decode_cursor
+from readonly_manager import ReadOnlyStudentManager
+from reports import render_transcript, generate_reports, FORMATS
 from typing import Optional
 
 
 class LoginWindow:
-    def __init__(self):
+    def __init__(self, auth: Optional[AuthManager] = None):
+        self.auth = auth or AuthManager()
         self.root = tk.Tk()
         self.root.title("Student Management System - Login")
         self.root.geometry("450x400")
@@ -13,7 +22,7 @@ class LoginWindow:
 
         self.center_window()
 
-        self.user_role = None
+        self.session = None
         self.setup_ui()
 
     def center_window(self):
@@ -81,17 +90,14 @@ class LoginWindow:
         password = self.password_entry.get().strip()
         role = self.role_var.get()
 
-        credentials = {
-            'admin': {'password': 'admin123', 'role': 'Admin'},
-            'teacher': {'password': 'teach123', 'role': 'Teacher'},
-            'viewer': {'password': 'view123', 'role': 'Viewer'}
-        }
+        session = self.auth.authenticate(username, password)
 
-        if username in credentials and credentials[username]['password'] == password:
-            if credentials[username]['role'] == role:
-                self.user_role = role
+        if session:
+            if session.role == role:
+                self.session = session
                 self.root.destroy()
             else:
+                self.auth.logout(session.token)
                 messagebox.showerror("Error", "Invalid role selected for this user")
                 self.password_entry.delete(0, tk.END)
                 self.password_entry.focus()
@@ -100,25 +106,54 @@ class LoginWindow:
             self.password_entry.delete(0, tk.END)
             self.username_entry.focus()
 
-    def show(self) -> Optional[str]:
+    def show(self) -> Optional[Session]:
 
         self.root.mainloop()
-        return self.user_role
+        return self.session
 
 
 class StudentManagementGUI:
 
-    def __init__(self, user_role: str, filename: str = "students.txt"):
+    WATCH_INTERVAL_MS = 2000
+    EVENT_POLL_MS = 100
+    PAGE_SIZE = 500
 
+    def __init__(self, session: Session, filename: str = "students.txt",
+                 fast_start: bool = True):
+
+        self.started_at = time.perf_counter()
         self.root = tk.Tk()
-        self.root.title(f"Student Management System - {user_role}")
+        self.root.title(f"Student Management System - {session.role}")
         self.root.geometry("1200x700")
 
-        self.user_role = user_role
-        self.manager = StudentManager(filename)
+        self.session = session
+        self.user_role = session.role
+        self.fast_start = fast_start
+        self.loaded = False
+        self.relogin = False  # Set when the session expires, so main() shows the login again
+        self.window_shown_at = None
+
+        # In fast-start mode the window comes up first and the records are
+        # parsed on a background thread while a progress bar runs
+        if session.read_only:
+            # Read-only roles cannot change anything, so they only map and index the file
+            self.manager = ReadOnlyStudentManager(filename, autoload=not fast_start,
+                                                  session=session, refresh_on_read=False)
+        else:
+            self.manager = StudentManager(filename, autoload=not fast_start, session=session)
+
+        # Rows are updated from the manager's change events rather than by
+        # rebuilding the whole list after every action
+        self.pending_events = queue.Queue()  # Events from the watcher thread
+        self.manager.subscribe(self.on_data_changed)
 
         self.setup_ui()
-        self.refresh_student_list()
+        self.root.after(0, self.mark_window_shown)
+
+        if fast_start:
+            self.start_background_load()
+        else:
+            self.finish_loading()
 
     def setup_ui(self):
         main_container = ttk.Frame(self.root, padding="10")
@@ -156,29 +191,35 @@ class StudentManagementGUI:
     def setup_input_forms(self, parent):
         notebook = ttk.Notebook(parent)
         notebook.pack(fill=tk.BOTH, expand=True)
-
-        add_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(add_tab, text="Add Student")
-        self.setup_add_student_form(add_tab)
-
-        enroll_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(enroll_tab, text="Enroll Subject")
-        self.setup_enroll_form(enroll_tab)
-
-        complete_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(complete_tab, text="Mark Completed")
-        self.setup_complete_form(complete_tab)
-
-        search_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(search_tab, text="Search Student")
-        self.setup_search_form(search_tab)
-
-        if self.user_role == "Teacher":
-            notebook.tab(0, state="disabled")  # Disable Add Student
-        elif self.user_role == "Viewer":
-            notebook.tab(0, state="disabled")  # Disable Add Student
-            notebook.tab(1, state="disabled")  # Disable Enroll
-            notebook.tab(2, state="disabled")  # Disable Mark Completed
+        self.notebook = notebook
+
+        # Tab contents are built the first time a tab is selected, so tabs the
+        # role cannot open are never built at all
+        self.tab_builders = {}
+        for text, builder, permission in (
+                ("Add Student", self.setup_add_student_form, ADD_STUDENT),
+                ("Enroll Subject", self.setup_enroll_form, ENROLL),
+                ("Mark Completed", self.setup_complete_form, COMPLETE),
+                ("Bulk Entry", self.setup_bulk_form, ENROLL),
+                ("Search Student", self.setup_search_form, VIEW)):
+            tab = ttk.Frame(notebook, padding="10")
+            notebook.add(tab, text=text)
+            self.tab_builders[str(tab)] = (tab, builder)
+            if not self.session.can(permission):
+                notebook.tab(tab, state="disabled")
+
+        notebook.bind('<<NotebookTabChanged>>', self.build_selected_tab)
+        for index in range(notebook.index('end')):
+            if notebook.tab(index, 'state') != "disabled":
+                notebook.select(index)
+                break
+        self.build_selected_tab()
+
+    def build_selected_tab(self, event=None):
+        entry = self.tab_builders.pop(self.notebook.select(), None)
+        if entry:
+            tab, builder = entry
+            builder(tab)
 
     def setup_add_student_form(self, parent):
         ttk.Label(parent, text="Student ID:", font=("Arial", 10)).grid(row=0, column=0,
@@ -201,7 +242,7 @@ class StudentManagementGUI:
         add_btn = ttk.Button(parent, text="Add Student", command=self.add_student)
         add_btn.grid(row=4, column=0, columnspan=2, pady=20)
 
-        if self.user_role != "Admin":
+        if not self.session.can(ADD_STUDENT):
             add_btn.config(state="disabled")
 
     def setup_enroll_form(self, parent):
@@ -218,7 +259,7 @@ class StudentManagementGUI:
         enroll_btn = ttk.Button(parent, text="Enroll Student", command=self.enroll_student)
         enroll_btn.grid(row=2, column=0, columnspan=2, pady=20)
 
-        if self.user_role == "Viewer":
+        if not self.session.can(ENROLL):
             enroll_btn.config(state="disabled")
 
     def setup_complete_form(self, parent):
@@ -241,9 +282,38 @@ class StudentManagementGUI:
                                   command=self.mark_completed)
         complete_btn.grid(row=3, column=0, columnspan=2, pady=20)
 
-        if self.user_role == "Viewer":
+        if not self.session.can(COMPLETE):
             complete_btn.config(state="disabled")
 
+    def setup_bulk_form(self, parent):
+        ttk.Label(parent, text="Subject Code:", font=("Arial", 10)).grid(row=0, column=0,
+                                                                         sticky=tk.W, pady=5)
+        self.bulk_subject_entry = ttk.Entry(parent, width=30)
+        self.bulk_subject_entry.grid(row=0, column=1, pady=5, padx=5)
+
+        ttk.Label(parent, text="Student IDs:", font=("Arial", 10)).grid(row=1, column=0,
+                                                                        sticky=tk.NW, pady=5)
+        ttk.Label(parent, text="(one per line; add ,MARK to complete)", font=("Arial", 8),
+                  foreground="gray").grid(row=1, column=1, sticky=tk.W, padx=5)
+        self.bulk_ids_text = scrolledtext.ScrolledText(parent, height=8, width=30, wrap=tk.WORD)
+        self.bulk_ids_text.grid(row=2, column=0, columnspan=2, pady=5, sticky=(tk.W, tk.E))
+
+        button_frame = ttk.Frame(parent)
+        button_frame.grid(row=3, column=0, columnspan=2, pady=10)
+
+        enroll_all_btn = ttk.Button(button_frame, text="Enroll All",
+                                    command=self.bulk_enroll)
+        enroll_all_btn.pack(side=tk.LEFT, padx=5)
+
+        complete_all_btn = ttk.Button(button_frame, text="Mark All Completed",
+                                      command=self.bulk_complete)
+        complete_all_btn.pack(side=tk.LEFT, padx=5)
+
+        if not self.session.can(ENROLL):
+            enroll_all_btn.config(state="disabled")
+        if not self.session.can(COMPLETE):
+            complete_all_btn.config(state="disabled")
+
     def setup_search_form(self, parent):
         ttk.Label(parent, text="Student ID:", font=("Arial", 10)).grid(row=0, column=0,
                                                                        sticky=tk.W, pady=5)
@@ -268,12 +338,23 @@ class StudentManagementGUI:
         columns = ("ID", "Name", "Enrolled", "Completed", "Avg Mark")
         self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=20)
 
-        # Define column headings
-        self.tree.heading("ID", text="Student ID")
-        self.tree.heading("Name", text="Student Name")
+        # Define column headings; clicking a sortable one re-sorts the list
+        self.sort_key = "id"
+        self.sort_descending = False
+        self.page_cursor = None
+        self.row_keys = []
+        self.row_key_of = {}
+        self.sort_columns = {"ID": ("id", "Student ID"),
+                             "Name": ("name", "Student Name"),
+                             "Completed": ("completed", "Subjects Completed"),
+                             "Avg Mark": ("average", "Average Mark")}
+        self.tree.heading("ID", text="Student ID", command=lambda: self.sort_by("ID"))
+        self.tree.heading("Name", text="Student Name", command=lambda: self.sort_by("Name"))
         self.tree.heading("Enrolled", text="Subjects Enrolled")
-        self.tree.heading("Completed", text="Subjects Completed")
-        self.tree.heading("Avg Mark", text="Average Mark")
+        self.tree.heading("Completed", text="Subjects Completed",
+                          command=lambda: self.sort_by("Completed"))
+        self.tree.heading("Avg Mark", text="Average Mark",
+                          command=lambda: self.sort_by("Avg Mark"))
 
         # Define column widths
         self.tree.column("ID", width=100)
@@ -285,6 +366,10 @@ class StudentManagementGUI:
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
 
+        self.load_more_btn = ttk.Button(parent, text="Load More", command=self.load_next_page,
+                                        state="disabled")
+        self.load_more_btn.pack(side=tk.BOTTOM, pady=(5, 0))
+
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
@@ -302,19 +387,175 @@ class StudentManagementGUI:
 
         undo_btn = ttk.Button(btn_frame, text="Undo Last Action", command=self.undo_action)
         undo_btn.pack(side=tk.LEFT, padx=5)
-        if self.user_role == "Viewer":
+        if not self.session.can(UNDO):
             undo_btn.config(state="disabled")
 
-        if self.user_role == "Admin":
+        if self.session.can(REMOVE_STUDENT):
             remove_btn = ttk.Button(btn_frame, text="Remove Selected Student",
                                     command=self.remove_student)
             remove_btn.pack(side=tk.LEFT, padx=5)
 
+        self.export_btn = ttk.Button(btn_frame, text="Export Reports",
+                                     command=self.export_reports)
+        self.export_btn.pack(side=tk.LEFT, padx=5)
+        self.export_format_var = tk.StringVar(value=FORMATS[0])
+        ttk.Combobox(btn_frame, textvariable=self.export_format_var, values=FORMATS,
+                     state="readonly", width=5).pack(side=tk.LEFT)
+
         self.status_label = tk.Label(parent, text="Ready", font=("Arial", 9),
                                      fg="green", anchor=tk.W)
         self.status_label.pack(side=tk.LEFT, padx=20, fill=tk.X, expand=True)
 
+        self.progress = ttk.Progressbar(parent, mode="indeterminate", length=150)
+
+    def start_background_load(self):
+        self.progress.pack(side=tk.RIGHT, padx=10)
+        self.progress.start(10)
+        self.status_label.config(text="Loading student records...")
+
+        self.load_thread = threading.Thread(target=self.manager.load_data, daemon=True)
+        self.load_thread.start()
+        self.root.after(50, self.check_background_load)
+
+    def check_background_load(self):
+        if self.load_thread.is_alive():
+            self.root.after(50, self.check_background_load)
+            return
+
+        self.progress.stop()
+        self.progress.pack_forget()
+        self.finish_loading()
+
+    def finish_loading(self):
+        self.loaded = True
+        self.refresh_student_list()
+        self.root.after(0, self.report_startup_time)
+        # Edits made by other processes are reloaded on the manager's own
+        # watcher thread, so re-indexing a large file never stalls the window
+        self.manager.watch_file(self.WATCH_INTERVAL_MS / 1000)
+        self.root.after(self.EVENT_POLL_MS, self.watch_data_file)
+
+    def watch_data_file(self):
+        if self.session.is_expired():
+            self.session_expired()
+            return
+
+        while True:
+            try:
+                events = self.pending_events.get_nowait()
+            except queue.Empty:
+                break
+            self.apply_changes(events)
+        self.root.after(self.EVENT_POLL_MS, self.watch_data_file)
+
+    def on_data_changed(self, events):
+        # Tk may only be touched from its own thread; reload events are handed over
+        if threading.current_thread() is not threading.main_thread():
+            self.pending_events.put(events)
+            return
+        self.apply_changes(events)
+
+    def apply_changes(self, events):
+        if not self.loaded:
+            return
+
+        if any(event.event_type == RELOADED for event in events):
+            self.root.after_idle(self.refresh_student_list)
+            return
+
+        for student_id in dict.fromkeys(event.student_id for event in events):
+            self.update_student_row(student_id)
+
+        if any(event.source == "external" for event in events):
+            self.update_status(f"Data file changed: {len(events)} update(s) applied")
+
+    def mark_window_shown(self):
+        self.window_shown_at = time.perf_counter()
+
+    def report_startup_time(self):
+        interactive_at = time.perf_counter()
+        shown_at = self.window_shown_at or interactive_at
+        print(f"Startup: window shown in {(shown_at - self.started_at) * 1000:.0f} ms, "
+              f"interactive in {(interactive_at - self.started_at) * 1000:.0f} ms "
+              f"({len(self.manager.list_all_students())} records)")
+
+    def export_reports(self):
+        if not self.data_ready():
+            return
+
+        output_dir = filedialog.askdirectory(title="Choose a folder for the reports")
+        if not output_dir:
+            return
+
+        # Streamed to the pipeline batch by batch; the read-only manager decodes
+        # each record only when it is reached. A writable roster is copied as
+        # a list of references so edits made meanwhile cannot shift it
+        students = self.manager.list_all_students()
+        if isinstance(students, list):
+            students = students[:]
+        fmt = self.export_format_var.get()  # Tk variables are read on the Tk thread only
+        self.export_done = 0
+        self.export_total = len(students)
+        self.export_result = None
+        self.export_btn.config(state="disabled")
+        self.progress.config(mode="determinate", maximum=max(self.export_total, 1), value=0)
+        self.progress.pack(side=tk.RIGHT, padx=10)
+
+        def progress(done, total):
+            self.export_done = done  # Read by check_export on the Tk thread
+
+        def run():
+            try:
+                self.export_result = generate_reports(students, output_dir, fmt,
+                                                      total=self.export_total,
+                                                      progress=progress)
+            except Exception as e:
+                self.export_result = e
+
+        self.export_thread = threading.Thread(target=run, daemon=True)
+        self.export_thread.start()
+        self.root.after(100, self.check_export)
+
+    def check_export(self):
+        self.progress.config(value=self.export_done)
+        self.status_label.config(text=f"Exporting reports: {self.export_done}/{self.export_total}")
+        if self.export_thread.is_alive():
+            self.root.after(100, self.check_export)
+            return
+
+        self.progress.pack_forget()
+        self.progress.config(mode="indeterminate")
+        self.export_btn.config(state="normal")
+        if isinstance(self.export_result, Exception):
+            messagebox.showerror("Error", f"Report export failed: {self.export_result}")
+            self.update_status("Report export failed")
+        else:
+            messagebox.showinfo("Success", f"Exported {self.export_result} transcripts")
+            self.update_status(f"Exported {self.export_result} transcripts")
+
+    def data_ready(self) -> bool:
+        if self.session.is_expired():
+            self.session_expired()
+            return False
+        if not self.loaded:
+            self.status_label.config(text="Still loading student records, please wait...")
+        return self.loaded
+
+    def session_expired(self):
+        # Every manager call is refused from here on, so ask for a new login
+        # instead of reporting each refusal as a failed action
+        if self.relogin:
+            return
+        self.relogin = True
+        self.manager.stop_watching()
+        messagebox.showwarning("Session Expired",
+                               "Your session has expired. Please log in again.")
+        self.root.destroy()
+
     def add_student(self):
+        if not self.data_ready():
+            return
+
         student_id = self.add_id_entry.get().strip()
         student_name = self.add_name_entry.get().strip()
         enrolled_str = self.add_enrolled_entry.get().strip()
@@ -332,12 +573,14 @@ class StudentManagementGUI:
         if self.manager.add_student(student):
             messagebox.showinfo("Success", f"Student {student_name} added successfully")
             self.clear_add_form()
-            self.refresh_student_list()
             self.update_status(f"Added student: {student_name}")
         else:
             messagebox.showerror("Error", f"Failed to add student (ID may already exist)")
 
     def enroll_student(self):
+        if not self.data_ready():
+            return
+
         student_id = self.enroll_id_entry.get().strip()
         subject = self.enroll_subject_entry.get().strip().upper()
 
@@ -348,12 +591,14 @@ class StudentManagementGUI:
         if self.manager.update_enrollment(student_id, subject):
             messagebox.showinfo("Success", f"Student enrolled in {subject}")
             self.clear_enroll_form()
-            self.refresh_student_list()
             self.update_status(f"Enrolled student {student_id} in {subject}")
         else:
             messagebox.showerror("Error", "Failed to enroll student (check console for details)")
 
     def mark_completed(self):
+        if not self.data_ready():
+            return
+
         student_id = self.complete_id_entry.get().strip()
         subject = self.complete_subject_entry.get().strip().upper()
         mark_str = self.complete_mark_entry.get().strip()
@@ -371,12 +616,72 @@ class StudentManagementGUI:
         if self.manager.mark_subject_completed(student_id, subject, mark):
             messagebox.showinfo("Success", f"Subject {subject} marked as completed with mark {mark}")
             self.clear_complete_form()
-            self.refresh_student_list()
             self.update_status(f"Marked {subject} completed for {student_id}")
         else:
             messagebox.showerror("Error", "Failed to mark subject as completed (check console for details)")
 
+    def bulk_enroll(self):
+        if not self.data_ready():
+            return
+
+        subject = self.bulk_subject_entry.get().strip().upper()
+        student_ids = [s for s in re.split(r'[\s,;]+', self.bulk_ids_text.get(1.0, tk.END))
+                       if s]
+
+        if not subject or not student_ids:
+            messagebox.showerror("Error", "Subject and at least one Student ID are required")
+            return
+
+        report = self.manager.enroll_many(student_ids, subject)
+        self.show_bulk_report(report, f"Enrolled in {subject}")
+
+    def bulk_complete(self):
+        if not self.data_ready():
+            return
+
+        subject = self.bulk_subject_entry.get().strip().upper()
+        items = []
+        for line in self.bulk_ids_text.get(1.0, tk.END).splitlines():
+            if not line.strip():
+                continue
+            parts = [p for p in re.split(r'[\s,;]+', line.strip()) if p]
+            if len(parts) != 2:
+                messagebox.showerror("Error", f"Expected 'ID,MARK' but got: {line.strip()}")
+                return
+            try:
+                items.append((parts[0], subject, int(parts[1])))
+            except ValueError:
+                messagebox.showerror("Error", f"Mark must be a valid integer: {line.strip()}")
+                return
+
+        if not subject or not items:
+            messagebox.showerror("Error", "Subject and at least one 'ID,MARK' line are required")
+            return
+
+        report = self.manager.complete_many(items)
+        self.show_bulk_report(report, f"Marked {subject} completed")
+
+    def show_bulk_report(self, report, action: str):
+        succeeded = sum(1 for result in report if result['success'])
+        failures = [f"{result['student_id']}: {result['message']}"
+                    for result in report if not result['success']]
+
+        summary = f"{action} for {succeeded} of {len(report)} entries"
+        if failures:
+            summary += "\n\nFailed:\n" + "\n".join(failures[:20])
+            if len(failures) > 20:
+                summary += f"\n... and {len(failures) - 20} more"
+            messagebox.showwarning("Bulk Entry", summary)
+        else:
+            messagebox.showinfo("Success", summary)
+            self.bulk_ids_text.delete(1.0, tk.END)
+
+        self.update_status(f"{action} for {succeeded} of {len(report)} entries")
+
     def search_student(self):
+        if not self.data_ready():
+            return
+
         student_id = self.search_id_entry.get().strip()
 
         if not student_id:
@@ -390,14 +695,14 @@ class StudentManagementGUI:
         if student:
             result = f"Student ID: {student.student_id}\n"
             result += f"Name: {student.student_name}\n\n"
-            result += f"Subjects Enrolled ({len(student.subjects_enrolled)}):\n"
+            result += f"Subjects Enrolled ({student.enrolled_count}):\n"
             if student.subjects_enrolled:
                 for subject in student.subjects_enrolled:
                     result += f"  • {subject}\n"
             else:
                 result += "  None\n"
 
-            result += f"\nSubjects Completed ({len(student.subjects_completed)}):\n"
+            result += f"\nSubjects Completed ({student.completed_count}):\n"
             if student.subjects_completed:
                 for i, subject in enumerate(student.subjects_completed):
                     mark = student.subjects_marks[i] if i < len(student.subjects_marks) else "N/A"
@@ -405,9 +710,8 @@ class StudentManagementGUI:
             else:
                 result += "  None\n"
 
-            if student.subjects_marks:
-                avg_mark = sum(student.subjects_marks) / len(student.subjects_marks)
-                result += f"\nAverage Mark: {avg_mark:.2f}"
+            if student.average_mark is not None:
+                result += f"\nAverage Mark: {student.average_mark:.2f}"
 
             self.search_result_text.insert(1.0, result)
             self.update_status(f"Found student: {student.student_name}")
@@ -416,57 +720,125 @@ class StudentManagementGUI:
             self.update_status(f"Student not found: {student_id}")
 
     def remove_student(self):
+        if not self.data_ready():
+            return
+
         selection = self.tree.selection()
         if not selection:
             messagebox.showwarning("Warning", "Please select a student to remove")
             return
 
-        item = self.tree.item(selection[0])
-        student_id = item['values'][0]
+        student_id = selection[0]  # Rows are keyed by student ID
 
         confirm = messagebox.askyesno("Confirm Deletion",
                                       f"Are you sure you want to remove student {student_id}?")
         if confirm:
             if self.manager.remove_student(student_id):
                 messagebox.showinfo("Success", f"Student {student_id} removed successfully")
-                self.refresh_student_list()
                 self.update_status(f"Removed student: {student_id}")
             else:
                 messagebox.showerror("Error", "Failed to remove student")
 
     def refresh_student_list(self):
+        if not self.data_ready():
+            return
+
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        students = self.manager.list_all_students()
+        self.page_cursor = None
+        # Ascending (key, student_id) of every row shown, whatever the display
+        # direction, so changed rows can be put back in their sorted place
+        self.row_keys = []
+        self.row_key_of = {}
+        self.load_next_page()
+
+    def load_next_page(self):
+        if not self.data_ready():
+            return
+
+        # Pages come from the manager's sorted indexes, so only the rows shown are touched
+        students, self.page_cursor = self.manager.list_students(
+            after=self.page_cursor, limit=self.PAGE_SIZE, sort=self.sort_key,
+            descending=self.sort_descending)
 
         for student in students:
-            enrolled_count = len(student.subjects_enrolled)
-            completed_count = len(student.subjects_completed)
+            if not self.tree.exists(student.student_id):
+                self.tree.insert('', tk.END, iid=student.student_id,
+                                 values=self.student_row(student))
+                self.remember_row(student)
+
+        self.load_more_btn.config(state="normal" if self.page_cursor else "disabled")
+        more = " (more available)" if self.page_cursor else ""
+        self.update_status(f"Displaying {len(self.tree.get_children())} students{more}")
+
+    def sort_by(self, column: str):
+        sort_key, _ = self.sort_columns[column]
+        if sort_key == self.sort_key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = sort_key
+            self.sort_descending = False
 
-            if student.subjects_marks:
-                avg_mark = sum(student.subjects_marks) / len(student.subjects_marks)
-                avg_mark_str = f"{avg_mark:.1f}"
-            else:
-                avg_mark_str = "N/A"
+        for name, (key, text) in self.sort_columns.items():
+            if key == self.sort_key:
+                text += " ▼" if self.sort_descending else " ▲"
+            self.tree.heading(name, text=text)
+
+        self.refresh_student_list()
 
-            self.tree.insert('', tk.END, values=(
-                student.student_id,
+    def student_row(self, student: Student):
+        if student.average_mark is not None:
+            avg_mark_str = f"{student.average_mark:.1f}"
+        else:
+            avg_mark_str = "N/A"
+
+        return (student.student_id,
                 student.student_name,
-                f"{enrolled_count} subjects",
-                f"{completed_count} subjects",
-                avg_mark_str
-            ))
+                f"{student.enrolled_count} subjects",
+                f"{student.completed_count} subjects",
+                avg_mark_str)
+
+    def remember_row(self, student: Student) -> int:
+        entry = (SORT_KEYS[self.sort_key](student), student.student_id)
+        position = bisect.bisect_left(self.row_keys, entry)
+        self.row_keys.insert(position, entry)
+        self.row_key_of[student.student_id] = entry[0]
+        return len(self.row_keys) - 1 - position if self.sort_descending else position
+
+    def forget_row(self, student_id: str):
+        if student_id in self.row_key_of:
+            entry = (self.row_key_of.pop(student_id), student_id)
+            del self.row_keys[bisect.bisect_left(self.row_keys, entry)]
+        if self.tree.exists(student_id):
+            self.tree.delete(student_id)
+
+    def update_student_row(self, student_id: str):
+        self.forget_row(student_id)
+        student = self.manager.search_student(student_id)
+        if student is None:
+            return
+
+        # Rows past the last loaded page are left for "Load More" to bring in,
+        # exactly as list_students will return them after the page cursor
+        if self.page_cursor is not None:
+            entry = (SORT_KEYS[self.sort_key](student), student_id)
+            boundary = decode_cursor(self.page_cursor, self.sort_key)
+            if (entry < boundary) if self.sort_descending else (entry > boundary):
+                return
 
-        self.update_status(f"Displaying {len(students)} students")
+        self.tree.insert('', self.remember_row(student), iid=student_id,
+                         values=self.student_row(student))
 
     def view_student_details(self, event):
+        if not self.data_ready():
+            return
+
         selection = self.tree.selection()
         if not selection:
             return
 
-        item = self.tree.item(selection[0])
-        student_id = item['values'][0]
+        student_id = selection[0]  # Rows are keyed by student ID
 
         student = self.manager.search_student(student_id)
         if not student:
@@ -479,39 +851,15 @@ class StudentManagementGUI:
         text = scrolledtext.ScrolledText(detail_window, wrap=tk.WORD, padx=10, pady=10)
         text.pack(fill=tk.BOTH, expand=True)
 
-        details = f"{'=' * 50}\n"
-        details += f"STUDENT DETAILS\n"
-        details += f"{'=' * 50}\n\n"
-        details += f"Student ID: {student.student_id}\n"
-        details += f"Name: {student.student_name}\n\n"
-
-        details += f"SUBJECTS ENROLLED ({len(student.subjects_enrolled)}):\n"
-        details += f"{'-' * 50}\n"
-        if student.subjects_enrolled:
-            for subject in student.subjects_enrolled:
-                details += f"  • {subject}\n"
-        else:
-            details += "  No subjects currently enrolled\n"
-
-        details += f"\nSUBJECTS COMPLETED ({len(student.subjects_completed)}):\n"
-        details += f"{'-' * 50}\n"
-        if student.subjects_completed:
-            for i, subject in enumerate(student.subjects_completed):
-                mark = student.subjects_marks[i] if i < len(student.subjects_marks) else "N/A"
-                details += f"  • {subject}: {mark}/100\n"
-        else:
-            details += "  No subjects completed yet\n"
-
-        if student.subjects_marks:
-            avg_mark = sum(student.subjects_marks) / len(student.subjects_marks)
-            details += f"\n{'=' * 50}\n"
-            details += f"Average Mark: {avg_mark:.2f}/100\n"
-            details += f"{'=' * 50}\n"
+        details = render_transcript(student)
 
         text.insert(1.0, details)
         text.config(state=tk.DISABLED)
 
     def show_statistics(self):
+        if not self.data_ready():
+            return
+
         stats = self.manager.get_statistics()
 
         stats_window = tk.Toplevel(self.root)
@@ -551,9 +899,11 @@ class StudentManagementGUI:
         text.config(state=tk.DISABLED)
 
     def undo_action(self):
+        if not self.data_ready():
+            return
+
         if self.manager.undo_last_action():
             messagebox.showinfo("Success", "Last action undone successfully")
-            self.refresh_student_list()
             self.update_status("Undid last action")
         else:
             messagebox.showinfo("Info", "No actions to undo")
@@ -578,16 +928,22 @@ class StudentManagementGUI:
 
     def run(self):
         self.root.mainloop()
+        self.manager.stop_watching()
 
 
 def main():
-    login = LoginWindow()
-    user_role = login.show()
-
-    # If login successful, show main application
-    if user_role:
-        app = StudentManagementGUI(user_role)
+    auth = AuthManager()
+    while True:
+        session = LoginWindow(auth).show()
+
+        # If login successful, show main application
+        if not session:
+            break
+        app = StudentManagementGUI(session)
         app.run()
+        auth.logout(session.token)
+        if not app.relogin:
+            break
 
 
 if __name__ == "__main__":
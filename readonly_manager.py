@@ -0,0 +1,365 @@
+import os
+import locale
+import threading
+from array import array
+from collections.abc import Sequence
+from typing import List, Optional, Dict, Tuple
+
+from auth import Session, VIEW
+from student_manager import (Student, ChangeNotifier, RELOADED, SORT_KEYS, page_entries,
+                             _locked, _check_session)
+
+
+class _Index:
+
+    # One indexing of the data file, bound to the file it was built from.
+    # Writers replace the file rather than rewrite it, so an index built
+    # before a save keeps reading the old, unchanged file and its offsets stay
+    # true; only an append is written in place, and it moves no earlier record
+
+    def __init__(self, fd: Optional[int], stamp: Optional[Tuple[int, int]], encoding: str):
+        self._fd = fd
+        self.stamp = stamp
+        self.encoding = encoding
+        self.starts = array('q')  # Offsets of each valid record line; the only
+        self.ends = array('q')    # per-record state kept
+        self.ids: Dict[str, int] = {}
+        self.sort_indexes: Dict[str, List[Tuple]] = {}
+        self._lock = threading.Lock()  # Seek and read as one step
+
+    def __del__(self):
+        if self._fd is not None:
+            os.close(self._fd)
+
+    def decode(self, index: int) -> Student:
+
+        start = self.starts[index]
+        end = self.ends[index]
+        # One byte before the record is read too, to check it still starts a line
+        first = max(start - 1, 0)
+        with self._lock:
+            stat = os.fstat(self._fd)
+            os.lseek(self._fd, first, os.SEEK_SET)
+            data = os.read(self._fd, end - first)
+
+        # Anything but an append means the file was rewritten in place by
+        # something other than a StudentManager, and these offsets are void
+        if (stat.st_mtime_ns, stat.st_size) != self.stamp and stat.st_size <= self.stamp[1]:
+            raise RuntimeError(f"Record {index} is stale: the data file was rewritten")
+        stale = len(data) != end - first or (start and data[:1] != b'\n') or \
+            not (data.endswith(b'\n') or end == self.stamp[1])
+        if not stale:
+            try:
+                student = Student.from_string(data[start - first:].decode(self.encoding))
+                stale = student.student_id not in self.ids
+            except (ValueError, UnicodeDecodeError):
+                stale = True
+        if stale:
+            raise RuntimeError(f"Record {index} is stale: the data file was rewritten")
+        return student
+
+
+class _RecordView(Sequence):
+
+    def __init__(self, index: _Index):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._index.decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return self._index.decode(index)
+
+
+def _is_record(line: str) -> bool:
+
+    # Student.from_string only rejects a line with fewer than two fields or a
+    # mark int() cannot parse; plain digit marks need no parsing to know that
+    parts = line.split(',', 5)
+    if len(parts) < 2:
+        return False
+    marks = parts[4] if len(parts) > 4 else ''
+    if not marks or all(mark.isdecimal() for mark in marks.split(';')):
+        return True
+    try:
+        Student.from_string(line)  # Signs, spaces and the like: let int() decide
+        return True
+    except ValueError:
+        return False
+
+
+class ReadOnlyStudentManager(ChangeNotifier):
+
+    def __init__(self, filename: str = "students.txt", autoload: bool = True,
+                 session: Optional[Session] = None, refresh_on_read: bool = True):
+
+        ChangeNotifier.__init__(self)
+        self.filename = filename
+        self.session = session  # None means unrestricted, as for local scripts
+        # With refresh_on_read off, only check_for_changes re-indexes, so a GUI
+        # can leave that to watch_file and never index on its own thread
+        self.refresh_on_read = refresh_on_read
+        self.encoding = locale.getpreferredencoding(False)
+        self.action_history: List[Dict] = []  # Always empty, nothing can be undone
+        # Records are read with seek/read rather than through a memory map:
+        # touching a mapped page past the end of a truncated file kills the
+        # process with SIGBUS
+        self._index = _Index(None, None, self.encoding)
+
+        if autoload:
+            self.load_data()
+
+    @_locked
+    def load_data(self) -> bool:
+
+        try:
+            fd = os.open(self.filename, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except FileNotFoundError:
+            self._index = _Index(None, None, self.encoding)
+            self._file_stamp = None
+            print(f"Data file not found: {self.filename}")
+            return True
+        except OSError as e:
+            print(f"Error loading data: {e}")
+            return False
+
+        try:
+            before = os.fstat(fd)
+            index = _Index(fd, (before.st_mtime_ns, before.st_size), self.encoding)
+        except Exception as e:
+            os.close(fd)
+            print(f"Error loading data: {e}")
+            return False
+
+        try:
+            # Only record boundaries and IDs are kept. Lines are checked with
+            # _is_record, so exactly the lines a full load would skip are left
+            # out and the record view lines up with it
+            position = 0
+            with open(os.dup(fd), 'rb') as f:
+                for raw_line in f:
+                    start = position
+                    position += len(raw_line)
+                    line = raw_line.decode(self.encoding).strip()
+                    if not line:
+                        continue
+                    if not _is_record(line):
+                        print(f"Warning: Skipping invalid record at byte {start}")
+                        continue
+                    index.ids.setdefault(line.split(',', 1)[0], len(index.starts))
+                    index.starts.append(start)
+                    index.ends.append(position)
+
+            # An append caught halfway would index a partial record; keep the
+            # old index and let the next check_for_changes try again
+            after = os.stat(self.filename)
+            if position != before.st_size or \
+                    (after.st_mtime_ns, after.st_size) != index.stamp:
+                raise OSError(f"{self.filename} changed while it was being indexed")
+
+            # The stamp of what was indexed, so a later change is still seen
+            self._index = index
+            self._file_stamp = index.stamp
+            print(f"Indexed {len(index.starts)} student records from {self.filename}")
+            return True
+
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return False
+
+    def _reload_external(self) -> bool:
+
+        if not self.load_data():
+            return False
+        # Records are not kept decoded, so there is nothing to diff against
+        self._emit(RELOADED, None, source="external")
+        return True
+
+    def _current(self) -> _Index:
+
+        if self.refresh_on_read:
+            self.check_for_changes()
+        return self._index
+
+    def _read_only(self, action: str) -> bool:
+
+        print(f"Error: Cannot {action} in read-only mode")
+        return False
+
+    def save_data(self) -> bool:
+        return self._read_only("save data")
+
+    def add_student(self, student: Student) -> bool:
+        return self._read_only("add students")
+
+    def remove_student(self, student_id: str) -> bool:
+        return self._read_only("remove students")
+
+    def update_enrollment(self, student_id: str, subject: str) -> bool:
+        return self._read_only("update enrollments")
+
+    def mark_subject_completed(self, student_id: str, subject: str, mark: int) -> bool:
+        return self._read_only("mark subjects completed")
+
+    def enroll_many(self, student_ids: List[str], subject: str) -> List[Dict]:
+        self._read_only("update enrollments")
+        return [{'student_id': student_id, 'subject': subject, 'success': False,
+                 'message': "Read-only mode"} for student_id in student_ids]
+
+    def complete_many(self, items: List[Tuple[str, str, int]]) -> List[Dict]:
+        self._read_only("mark subjects completed")
+        return [{'student_id': student_id, 'subject': subject, 'mark': mark, 'success': False,
+                 'message': "Read-only mode"} for student_id, subject, mark in items]
+
+    def undo_last_action(self) -> bool:
+
+        print("No actions to undo")
+        return False
+
+    def search_student(self, student_id: str) -> Optional[Student]:
+
+        if not _check_session(self.session, VIEW):
+            return None
+        index = self._current()
+        position = index.ids.get(student_id)
+        return index.decode(position) if position is not None else None
+
+    def list_all_students(self) -> Sequence:
+
+        # The view stays on the file as it was indexed now; records added
+        # later are not in it, and a rewrite in place makes it raise
+        if not _check_session(self.session, VIEW):
+            return []
+        return _RecordView(self._current())
+
+    def list_students(self, after: Optional[str] = None, limit: int = 100, sort: str = "id",
+                      descending: bool = False) -> Tuple[List[Student], Optional[str]]:
+
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if not _check_session(self.session, VIEW):
+            return [], None
+        index = self._current()
+
+        entries = index.sort_indexes.get(sort)
+        if entries is None:
+            if sort == "id":
+                # IDs are already in the index, so this order needs no decoding
+                entries = sorted((student_id, student_id) for student_id in index.ids)
+            else:
+                key_of = SORT_KEYS[sort]
+                entries = sorted((key_of(index.decode(position)), student_id)
+                                 for student_id, position in index.ids.items())
+            index.sort_indexes[sort] = entries
+
+        page, next_cursor = page_entries(entries, after, limit, descending, sort)
+        return [index.decode(index.ids[student_id]) for _, student_id in page], next_cursor
+
+    def get_statistics(self) -> Dict:
+
+        if not _check_session(self.session, VIEW):
+            return {}
+        index = self._current()
+        stats = {
+            'total_students': len(index.starts),
+            'subjects_enrollment_count': {},
+            'students_by_completed_count': {}
+        }
+
+        for student in _RecordView(index):
+            for subject in student.subjects_enrolled:
+                stats['subjects_enrollment_count'][subject] = \
+                    stats['subjects_enrollment_count'].get(subject, 0) + 1
+            name = f"{student.student_name} ({student.student_id})"
+            stats['students_by_completed_count'][name] = student.completed_count
+
+        return stats
+
+
+# Unit Tests
+if __name__ == "__main__":
+    from student_manager import StudentManager
+
+    print("Running Unit Tests for ReadOnlyStudentManager\n")
+    print("=" * 50)
+
+    with open("test_readonly.txt", 'w') as f:
+        f.write("S001,John Doe,COMP101;MATH201,PHYS101,85\n\n"
+                "broken\nS002,Jane Smith,COMP101,,\nS003,Bad Marks,,MATH101,abc\n"
+                "S004,Extra Field,,,85,extra\nS005,Odd Mark,,MATH101,1_0\n"
+                "S006,Aaron Sign,,MATH101;PHYS101,+7; 8\nS007,Empty Mark,,MATH101,85;\n")
+
+    print("\nTest 1: Index matches a full load")
+    writer = StudentManager("test_readonly.txt", auto_backup=False)
+    viewer = ReadOnlyStudentManager("test_readonly.txt")
+    assert [s.to_string() for s in viewer.list_all_students()] == \
+        [s.to_string() for s in writer.list_all_students()], "Record view differs from full load"
+    assert viewer.search_student("S002").student_name == "Jane Smith"
+    assert viewer.search_student("S003") is None, "Invalid record was indexed"
+    assert viewer.search_student("S004") and viewer.search_student("S005") and \
+        viewer.search_student("S006"), "Record a full load accepts was skipped"
+    assert viewer.search_student("S007") is None, "Record a full load rejects was indexed"
+    assert viewer.get_statistics() == writer.get_statistics()
+    page, cursor = viewer.list_students(limit=1, sort="name", descending=True)
+    assert page[0].student_id == "S005" and cursor is not None
+    assert viewer.list_students(after=cursor, sort="name", descending=True)[0][0].student_id \
+        == "S001"
+    print("✓ Index tests passed")
+
+    print("\nTest 2: Mutations are rejected")
+    assert viewer.add_student(Student("S009", "New")) == False
+    assert viewer.undo_last_action() == False
+    expired = ReadOnlyStudentManager("test_readonly.txt", session=Session("viewer", "Viewer", ttl=0))
+    assert expired.search_student("S002") is None and expired.get_statistics() == {}, \
+        "Expired session could still view records"
+    print("✓ Read-only tests passed")
+
+    print("\nTest 3: Re-indexing after the file changes")
+    received = []
+    viewer.subscribe(received.append)
+    assert writer.update_enrollment("S002", "ENG201")
+    assert "ENG201" in viewer.search_student("S002").subjects_enrolled, "Did not re-index"
+    assert writer.add_student(Student("S010", "Late Arrival"))
+    assert len(viewer.list_all_students()) == 6
+    assert viewer.check_for_changes() == False
+    assert received and received[0][0].event_type == RELOADED, "Re-index was not announced"
+    print("✓ Re-index tests passed")
+
+    print("\nTest 4: Views taken before a save")
+    view = viewer.list_all_students()
+    taken = [s.to_string() for s in view]
+    assert writer.add_student(Student("S011", "Appended"))  # Written in place
+    assert [s.to_string() for s in view] == taken, "Append disturbed a held view"
+    assert writer.update_enrollment("S001", "ART101")  # Publishes a new file
+    assert [s.to_string() for s in view] == taken, "Save shifted a held view"
+    assert "ART101" in viewer.search_student("S001").subjects_enrolled
+    view = viewer.list_all_students()
+    with open("test_readonly.txt", 'r+b') as f:
+        f.truncate(10)  # As a tool rewriting the file in place would
+    for position in (0, -1):
+        try:
+            view[position]
+            assert False, "Read a record from a file rewritten under the view"
+        except RuntimeError:
+            pass
+    assert len(viewer.list_all_students()) == 1, "Did not re-index after truncation"
+    print("✓ Stale view tests passed")
+
+    print("\nTest 5: Re-indexing only on check_for_changes")
+    lazy = ReadOnlyStudentManager("test_readonly.txt", refresh_on_read=False)
+    assert writer.load_data() and writer.add_student(Student("S012", "Later"))
+    assert lazy.search_student("S012") is None, "Read re-indexed with refresh_on_read off"
+    assert lazy.check_for_changes() and lazy.search_student("S012") is not None
+    print("✓ Deferred re-index tests passed")
+
+    del view, lazy, viewer
+    os.remove("test_readonly.txt")
+
+    print("\n" + "=" * 50)
+    print("All unit tests passed successfully! ✓")
@@ -0,0 +1,280 @@
+import os
+import re
+import csv
+import io
+import html
+import zlib
+from collections import deque
+from typing import List, Optional, Dict, Tuple, Callable, Iterable
+
+from student_manager import Student
+
+FORMATS = ("txt", "csv", "html")
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', value) or "_"
+
+
+def _transcript_name(student_id: str) -> str:
+
+    # Batches are written by separate workers, so a clash cannot be resolved by
+    # numbering as grade sheets are; IDs that needed changing (A/1 and A_1
+    # both become A_1) get a hash of the real ID instead
+    name = _safe_name(student_id)
+    if name != student_id:
+        name += f"-{zlib.crc32(student_id.encode('utf-8')):08x}"
+    return name
+
+
+def _completed_with_marks(student: Student) -> List[Tuple[str, object]]:
+    return [(subject, student.subjects_marks[i] if i < len(student.subjects_marks) else "N/A")
+            for i, subject in enumerate(student.subjects_completed)]
+
+
+def render_transcript(student: Student, fmt: str = "txt") -> str:
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["student_id", "student_name", "status", "subject", "mark"])
+        for subject in student.subjects_enrolled:
+            writer.writerow([student.student_id, student.student_name, "enrolled", subject, ""])
+        for subject, mark in _completed_with_marks(student):
+            writer.writerow([student.student_id, student.student_name, "completed", subject, mark])
+        return buffer.getvalue()
+
+    if fmt == "html":
+        parts = [f"<html><head><title>Transcript - {html.escape(student.student_id)}</title>"
+                 f"</head><body>",
+                 f"<h1>{html.escape(student.student_name)}</h1>",
+                 f"<p>Student ID: {html.escape(student.student_id)}</p>",
+                 f"<h2>Subjects Enrolled ({student.enrolled_count})</h2><ul>"]
+        parts.extend(f"<li>{html.escape(subject)}</li>" for subject in student.subjects_enrolled)
+        parts.append(f"</ul><h2>Subjects Completed ({student.completed_count})</h2>"
+                     f"<table><tr><th>Subject</th><th>Mark</th></tr>")
+        parts.extend(f"<tr><td>{html.escape(subject)}</td><td>{mark}</td></tr>"
+                     for subject, mark in _completed_with_marks(student))
+        parts.append("</table>")
+        if student.average_mark is not None:
+            parts.append(f"<p>Average Mark: {student.average_mark:.2f}/100</p>")
+        parts.append("</body></html>\n")
+        return "\n".join(parts)
+
+    if fmt != "txt":
+        raise ValueError(f"Unknown report format: {fmt}")
+
+    lines = [f"{'=' * 50}",
+             "STUDENT DETAILS",
+             f"{'=' * 50}",
+             "",
+             f"Student ID: {student.student_id}",
+             f"Name: {student.student_name}",
+             "",
+             f"SUBJECTS ENROLLED ({student.enrolled_count}):",
+             f"{'-' * 50}"]
+    if student.subjects_enrolled:
+        lines.extend(f"  • {subject}" for subject in student.subjects_enrolled)
+    else:
+        lines.append("  No subjects currently enrolled")
+
+    lines.extend(["", f"SUBJECTS COMPLETED ({student.completed_count}):", f"{'-' * 50}"])
+    if student.subjects_completed:
+        lines.extend(f"  • {subject}: {mark}/100"
+                     for subject, mark in _completed_with_marks(student))
+    else:
+        lines.append("  No subjects completed yet")
+
+    if student.average_mark is not None:
+        lines.extend(["", f"{'=' * 50}",
+                      f"Average Mark: {student.average_mark:.2f}/100",
+                      f"{'=' * 50}"])
+
+    return "\n".join(lines) + "\n"
+
+
+def _render_batch(students: List[Student], output_dir: str,
+                  fmt: str) -> Tuple[int, Dict[str, List[Tuple[str, str, object]]]]:
+
+    # Runs in a worker process: writes one transcript per student and hands
+    # the grade sheet rows back so the parent can append them in order
+    transcript_dir = os.path.join(output_dir, "transcripts")
+    grade_rows: Dict[str, List[Tuple[str, str, object]]] = {}
+
+    for student in students:
+        path = os.path.join(transcript_dir, f"{_transcript_name(student.student_id)}.{fmt}")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(render_transcript(student, fmt))
+        for subject, mark in _completed_with_marks(student):
+            grade_rows.setdefault(subject, []).append(
+                (student.student_id, student.student_name, mark))
+
+    return len(students), grade_rows
+
+
+def _sheet_path(sheet_dir: str, fmt: str, subject: str, sheets: Dict[str, str]) -> str:
+
+    # Different subjects can share a safe name (C++ and C__), so later ones
+    # get a numbered file instead of truncating the first one's sheet
+    if subject not in sheets:
+        taken = set(sheets.values())
+        name = _safe_name(subject)
+        path = os.path.join(sheet_dir, f"{name}.{fmt}")
+        number = 1
+        while path in taken:
+            number += 1
+            path = os.path.join(sheet_dir, f"{name}-{number}.{fmt}")
+        sheets[subject] = path
+    return sheets[subject]
+
+
+def _append_grade_rows(sheet_dir: str, fmt: str, rows_by_subject: Dict,
+                       sheets: Dict[str, str]) -> None:
+
+    for subject, rows in rows_by_subject.items():
+        started = subject in sheets
+        path = _sheet_path(sheet_dir, fmt, subject, sheets)
+        with open(path, 'a' if started else 'w', encoding='utf-8', newline='') as f:
+            if not started:
+                if fmt == "csv":
+                    f.write("student_id,student_name,mark\r\n")
+                elif fmt == "html":
+                    f.write(f"<html><head><title>Grade Sheet - {html.escape(subject)}</title>"
+                            f"</head><body><h1>{html.escape(subject)}</h1>\n"
+                            f"<table><tr><th>Student ID</th><th>Name</th><th>Mark</th></tr>\n")
+                else:
+                    f.write(f"GRADE SHEET: {subject}\n{'=' * 50}\n")
+
+            if fmt == "csv":
+                csv.writer(f).writerows(rows)
+            elif fmt == "html":
+                f.writelines(f"<tr><td>{html.escape(student_id)}</td>"
+                             f"<td>{html.escape(name)}</td><td>{mark}</td></tr>\n"
+                             for student_id, name, mark in rows)
+            else:
+                f.writelines(f"{student_id:<20}{name:<30}{mark}\n"
+                             for student_id, name, mark in rows)
+
+
+def _batches(students: Iterable[Student], batch_size: int) -> Iterable[List[Student]]:
+
+    batch = []
+    for student in students:
+        batch.append(student)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_reports(students: Iterable[Student], output_dir: str, fmt: str = "txt",
+                     workers: Optional[int] = None, batch_size: int = 500,
+                     total: Optional[int] = None,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None) -> int:
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+
+    sheet_dir = os.path.join(output_dir, "grade_sheets")
+    os.makedirs(os.path.join(output_dir, "transcripts"), exist_ok=True)
+    os.makedirs(sheet_dir, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    sheets: Dict[str, str] = {}  # Grade sheet path per subject
+    done = 0
+
+    def collect(result) -> None:
+        nonlocal done
+        count, rows_by_subject = result
+        _append_grade_rows(sheet_dir, fmt, rows_by_subject, sheets)
+        done += count
+        if progress:
+            progress(done, total)
+
+    if workers == 1:
+        for batch in _batches(students, batch_size):
+            collect(_render_batch(batch, output_dir, fmt))
+    else:
+        # Imported here so the GUI does not pay for it until a report is run
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # At most two batches per worker are in flight, which bounds memory
+        # no matter how many students are streamed through
+        pending = deque()
+        # Spawned rather than forked: the GUI calls this from a worker thread,
+        # and forking a threaded process can deadlock
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            for batch in _batches(students, batch_size):
+                pending.append(pool.submit(_render_batch, batch, output_dir, fmt))
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    if fmt == "html":
+        for path in sheets.values():
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("</table></body></html>\n")
+
+    print(f"Generated {done} transcripts and {len(sheets)} grade sheets in {output_dir}")
+    return done
+
+
+# Unit Tests
+if __name__ == "__main__":
+    import shutil
+
+    print("Running Unit Tests for reports\n")
+    print("=" * 50)
+
+    students = [Student(f"S{i:03d}", f"Student {i}", ["COMP101"], ["MATH101", "PHYS101"],
+                        [60 + i % 40, 70]) for i in range(50)]
+
+    print("\nTest 1: Rendering transcripts")
+    text = render_transcript(students[0])
+    assert "Student ID: S000" in text and "MATH101: 60/100" in text
+    assert "Average Mark: 65.00/100" in text
+    assert render_transcript(students[0], "csv").count("\n") == 4
+    assert "<td>MATH101</td>" in render_transcript(students[0], "html")
+    print("✓ Rendering tests passed")
+
+    print("\nTest 2: Parallel pipeline matches serial output")
+    seen = []
+    assert generate_reports(iter(students), "test_reports_serial", "csv", workers=1,
+                            batch_size=7) == 50
+    assert generate_reports(iter(students), "test_reports_parallel", "csv", workers=2,
+                            batch_size=7, total=50,
+                            progress=lambda done, total: seen.append(done)) == 50
+    assert seen[-1] == 50, "Progress callback did not reach the total"
+    for name in ("transcripts/S007.csv", "grade_sheets/MATH101.csv"):
+        with open(os.path.join("test_reports_serial", name)) as a, \
+                open(os.path.join("test_reports_parallel", name)) as b:
+            assert a.read() == b.read(), f"{name} differs between serial and parallel runs"
+    with open("test_reports_parallel/grade_sheets/PHYS101.csv") as f:
+        assert len(f.readlines()) == 51
+    print("✓ Pipeline tests passed")
+
+    print("\nTest 3: Subjects with the same safe name keep separate sheets")
+    clashing = [Student("S001", "A", [], ["C++"], [80]), Student("S002", "B", [], ["C__"], [70])]
+    generate_reports(clashing, "test_reports_clash", "txt", workers=1)
+    with open("test_reports_clash/grade_sheets/C__.txt") as f:
+        first = f.read()
+    with open("test_reports_clash/grade_sheets/C__-2.txt") as f:
+        second = f.read()
+    assert "GRADE SHEET: C++" in first and "S001" in first, "First subject was overwritten"
+    assert "GRADE SHEET: C__" in second and "S002" in second
+    clashing = [Student("A/1", "Slash"), Student("A_1", "Underscore")]
+    generate_reports(clashing, "test_reports_clash", "txt", workers=1)
+    transcripts = sorted(os.listdir("test_reports_clash/transcripts"))
+    assert len(transcripts) == 4 and "A_1.txt" in transcripts, "Transcripts overwrote each other"
+    print("✓ Name clash tests passed")
+
+    shutil.rmtree("test_reports_serial")
+    shutil.rmtree("test_reports_parallel")
+    shutil.rmtree("test_reports_clash")
+
+    print("\n" + "=" * 50)
+    print("All unit tests passed successfully! ✓")
@@ -0,0 +1,421 @@
+import os
+import re
+import json
+import glob
+import shutil
+import zlib
+import heapq
+from typing import List, Optional, Dict, Tuple
+
+from auth import Session, VIEW, UNDO
+from student_manager import StudentManager, Student, SORT_KEYS, encode_cursor, _check_session
+
+
+class ShardedStudentManager:
+
+    PARTITIONS = ("hash", "cohort")
+
+    def __init__(self, filename: str = "students.txt", num_shards: int = 4,
+                 partition: str = "hash", prefix_length: int = 6,
+                 auto_backup: bool = True, session: Optional[Session] = None):
+
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unknown partition scheme: {partition}")
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+
+        self.filename = filename
+        self.num_shards = num_shards
+        self.partition = partition
+        self.prefix_length = prefix_length
+        self.auto_backup = auto_backup
+        self.session = session  # Checked by every shard manager
+        self.shards: Dict[str, StudentManager] = {}
+        self.action_history: List[List[str]] = []  # Shard keys per action, for undo
+
+        self._check_layout()
+        self.load_data()
+
+    def layout_filename(self) -> str:
+
+        return f"{os.path.splitext(self.filename)[0]}.shards.json"
+
+    def _layout(self) -> Dict:
+
+        if self.partition == "hash":
+            return {'partition': self.partition, 'num_shards': self.num_shards}
+        return {'partition': self.partition, 'prefix_length': self.prefix_length}
+
+    def _check_layout(self) -> None:
+
+        # Records are routed by the layout they were saved with; opening them
+        # with another one would send lookups and duplicate checks astray
+        path = self.layout_filename()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            if stored != self._layout():
+                raise ValueError(f"{self.filename} is sharded as {stored}, "
+                                 f"not {self._layout()}")
+            return
+
+        with open(path, 'w') as f:
+            json.dump(self._layout(), f)
+
+    def shard_key(self, student_id: str) -> str:
+
+        if self.partition == "hash":
+            # crc32 is stable across processes, unlike the built-in hash()
+            return f"{zlib.crc32(student_id.encode('utf-8')) % self.num_shards:02d}"
+
+        prefix = student_id[:self.prefix_length]
+        return re.sub(r'[^A-Za-z0-9]', '_', prefix) or "_"
+
+    def shard_filename(self, key: str) -> str:
+
+        base = os.path.splitext(self.filename)[0]
+        label = "shard" if self.partition == "hash" else "cohort"
+        return f"{base}.{label}-{key}.txt"
+
+    def _existing_shard_keys(self) -> List[str]:
+
+        if self.partition == "hash":
+            return [f"{i:02d}" for i in range(self.num_shards)]
+
+        pattern = f"{glob.escape(os.path.splitext(self.filename)[0])}.cohort-*.txt"
+        keys = []
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)
+            keys.append(name[name.rindex(".cohort-") + len(".cohort-"):-len(".txt")])
+        return sorted(keys)
+
+    def _new_shard(self, key: str) -> StudentManager:
+
+        manager = StudentManager(self.shard_filename(key), self.auto_backup, autoload=False,
+                                 session=self.session)
+        self.shards[key] = manager
+        return manager
+
+    def _route(self, student_id: str, create: bool = False) -> Optional[StudentManager]:
+
+        key = self.shard_key(student_id)
+        manager = self.shards.get(key)
+        if manager is None and create:
+            manager = self._new_shard(key)
+        return manager
+
+    def load_data(self) -> bool:
+
+        try:
+            self.shards = {}
+            keys = self._existing_shard_keys()
+            for key in keys:
+                self._new_shard(key)
+
+            # Shards are loaded one after another: a process pool cannot win,
+            # since sending parsed records back costs as much as parsing them
+            to_load = [key for key in keys if os.path.exists(self.shard_filename(key))]
+            for key in to_load:
+                self.shards[key].load_data()
+
+            print(f"Loaded {len(self.list_all_students())} student records "
+                  f"from {len(to_load)} shard(s)")
+            return True
+
+        except Exception as e:
+            print(f"Error loading sharded data: {e}")
+            return False
+
+    def save_data(self) -> bool:
+
+        # Mutations already save the single shard they touch; this flushes all
+        return all([manager.save_data() for manager in self.shards.values()])
+
+    def import_file(self, source_filename: str) -> int:
+
+        # Each shard adds its share in one locked, validated batch and saves once
+        source = StudentManager(source_filename, auto_backup=False)
+        groups: Dict[str, List[Student]] = {}
+        for student in source.students:
+            groups.setdefault(self.shard_key(student.student_id), []).append(student)
+
+        touched = []
+        imported = 0
+        for key, students in groups.items():
+            manager = self._route(students[0].student_id, create=True)
+            report = manager.add_many(students)
+            for result in report:
+                if result['success']:
+                    imported += 1
+                else:
+                    print(f"Warning: Skipping {result['student_id']} - {result['message']}")
+            if any(result['success'] for result in report):
+                touched.append(key)
+
+        if touched:
+            self._record_keys(touched)
+        print(f"Imported {imported} student records from {source_filename}")
+        return imported
+
+    def _record(self, result: bool, student_id: str) -> bool:
+
+        if result:
+            self._record_keys([self.shard_key(student_id)])
+        return result
+
+    def _record_keys(self, keys: List[str]) -> None:
+
+        self.action_history.append(keys)
+        if len(self.action_history) > 10:
+            self.action_history.pop(0)
+
+    def add_student(self, student: Student) -> bool:
+
+        manager = self._route(student.student_id, create=True)
+        return self._record(manager.add_student(student), student.student_id)
+
+    def remove_student(self, student_id: str) -> bool:
+
+        manager = self._route(student_id)
+        if not manager:
+            print(f"Error: Student ID {student_id} not found")
+            return False
+        return self._record(manager.remove_student(student_id), student_id)
+
+    def search_student(self, student_id: str) -> Optional[Student]:
+
+        manager = self._route(student_id)
+        return manager.search_student(student_id) if manager else None
+
+    def update_enrollment(self, student_id: str, subject: str) -> bool:
+
+        manager = self._route(student_id)
+        if not manager:
+            print(f"Error: Student ID {student_id} not found")
+            return False
+        return self._record(manager.update_enrollment(student_id, subject), student_id)
+
+    def mark_subject_completed(self, student_id: str, subject: str, mark: int) -> bool:
+
+        manager = self._route(student_id)
+        if not manager:
+            print(f"Error: Student ID {student_id} not found")
+            return False
+        return self._record(manager.mark_subject_completed(student_id, subject, mark),
+                            student_id)
+
+    def _bulk(self, items: List, student_id_of, apply, missing) -> List[Dict]:
+
+        # Split the batch per shard, run each shard's bulk operation once and
+        # stitch the per-item reports back into request order
+        groups: Dict[str, List[int]] = {}
+        for position, item in enumerate(items):
+            groups.setdefault(self.shard_key(student_id_of(item)), []).append(position)
+
+        report: List[Optional[Dict]] = [None] * len(items)
+        touched = []
+        for key, positions in groups.items():
+            manager = self.shards.get(key)
+            if manager is None:
+                for position in positions:
+                    # Same fields the shard's own report would have
+                    report[position] = missing(items[position])
+                continue
+            shard_report = apply(manager, [items[position] for position in positions])
+            for position, result in zip(positions, shard_report):
+                report[position] = result
+            if any(result['success'] for result in shard_report):
+                touched.append(key)
+
+        if touched:
+            self._record_keys(touched)
+        return report
+
+    def enroll_many(self, student_ids: List[str], subject: str) -> List[Dict]:
+
+        return self._bulk(student_ids, lambda student_id: student_id,
+                          lambda manager, batch: manager.enroll_many(batch, subject),
+                          lambda student_id: {'student_id': student_id, 'subject': subject,
+                                              'success': False,
+                                              'message': f"Student ID {student_id} not found"})
+
+    def complete_many(self, items: List[Tuple[str, str, int]]) -> List[Dict]:
+
+        return self._bulk(items, lambda item: item[0],
+                          lambda manager, batch: manager.complete_many(batch),
+                          lambda item: {'student_id': item[0], 'subject': item[1],
+                                        'mark': item[2], 'success': False,
+                                        'message': f"Student ID {item[0]} not found"})
+
+    def _authorize(self, permission: str) -> bool:
+
+        # Checked once here for calls that span shards; each shard checks again
+        return _check_session(self.session, permission)
+
+    def list_all_students(self) -> List[Student]:
+
+        if not self._authorize(VIEW):
+            return []
+        students = []
+        for key in sorted(self.shards):
+            students.extend(self.shards[key].list_all_students())
+        return students
+
+    def list_students(self, after: Optional[str] = None, limit: int = 100, sort: str = "id",
+                      descending: bool = False) -> Tuple[List[Student], Optional[str]]:
+
+        # Every shard serves its own page from its sorted index; a k-way merge
+        # of those pages gives the global page without sorting the roster
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if limit < 1:
+            raise ValueError(f"Page limit must be at least 1, got {limit}")
+        if not self._authorize(VIEW):
+            return [], None
+        key_of = SORT_KEYS[sort]
+        pages = []
+        more = False
+        for manager in self.shards.values():
+            page, next_cursor = manager.list_students(after, limit, sort, descending)
+            pages.append([(key_of(student), student.student_id, student) for student in page])
+            more = more or next_cursor is not None
+
+        merged = list(heapq.merge(*pages, key=lambda entry: entry[:2], reverse=descending))
+        more = more or len(merged) > limit
+        merged = merged[:limit]
+        next_cursor = encode_cursor(sort, *merged[-1][:2]) if merged and more else None
+        return [entry[2] for entry in merged], next_cursor
+
+    def get_statistics(self) -> Dict:
+
+        if not self._authorize(VIEW):
+            return {}
+        stats = {
+            'total_students': 0,
+            'subjects_enrollment_count': {},
+            'students_by_completed_count': {}
+        }
+
+        for manager in self.shards.values():
+            shard_stats = manager.get_statistics()
+            stats['total_students'] += shard_stats['total_students']
+            for subject, count in shard_stats['subjects_enrollment_count'].items():
+                stats['subjects_enrollment_count'][subject] = \
+                    stats['subjects_enrollment_count'].get(subject, 0) + count
+            stats['students_by_completed_count'].update(
+                shard_stats['students_by_completed_count'])
+
+        return stats
+
+    def undo_last_action(self) -> bool:
+
+        if not self.action_history:
+            print("No actions to undo")
+            return False
+
+        # Checked before popping so a refused undo keeps its history entry
+        if not self.shards[self.action_history[-1][0]]._authorize(UNDO):
+            return False
+
+        keys = self.action_history.pop()
+        return all([self.shards[key].undo_last_action() for key in keys])
+
+
+# Unit Tests
+if __name__ == "__main__":
+    print("Running Unit Tests for ShardedStudentManager\n")
+    print("=" * 50)
+
+    print("\nTest 1: Hash partitioning routes and persists per shard")
+    manager = ShardedStudentManager("test_sharded.txt", num_shards=3)
+    for i in range(12):
+        assert manager.add_student(Student(f"S{i:03d}", f"Student {i}", ["COMP101"]))
+    assert manager.add_student(Student("S001", "Dup")) == False, "Duplicate ID should fail"
+    assert manager.search_student("S007").student_name == "Student 7"
+    assert sum(len(m.students) for m in manager.shards.values()) == 12
+    print("✓ Hash partitioning tests passed")
+
+    print("\nTest 2: Reloading shards")
+    reloaded = ShardedStudentManager("test_sharded.txt", num_shards=3)
+    assert len(reloaded.list_all_students()) == 12, "Reload lost records"
+    assert [s.to_string() for s in reloaded.list_all_students()] == \
+        [s.to_string() for s in manager.list_all_students()], "Reload changed records"
+    stats = reloaded.get_statistics()
+    assert stats['total_students'] == 12
+    assert stats['subjects_enrollment_count']['COMP101'] == 12
+    print("✓ Reload and merged statistics tests passed")
+
+    print("\nTest 2c: A different layout is refused")
+    for wrong in ({'num_shards': 4}, {'partition': "cohort"}):
+        try:
+            ShardedStudentManager("test_sharded.txt", **{'num_shards': 3, **wrong})
+            assert False, f"Opened with mismatched layout {wrong}"
+        except ValueError:
+            pass
+    print("✓ Layout tests passed")
+
+    print("\nTest 2b: Pages are merged across shards")
+    ids, cursor = [], None
+    while True:
+        page, cursor = reloaded.list_students(after=cursor, limit=5, descending=True)
+        ids.extend(s.student_id for s in page)
+        if cursor is None:
+            break
+    assert ids == sorted(ids, reverse=True) and len(ids) == 12, "Merged pages out of order"
+    try:
+        reloaded.list_students(limit=0)
+        assert False, "Accepted a zero page limit"
+    except ValueError:
+        pass
+    print("✓ Pagination tests passed")
+
+    print("\nTest 3: Undo is routed to the right shard")
+    assert reloaded.update_enrollment("S003", "MATH201") == True
+    for shard in reloaded.shards.values():
+        shard.session = Session("viewer", "Viewer")
+    assert reloaded.undo_last_action() == False, "Viewer undid an action"
+    assert len(reloaded.action_history) == 1, "Refused undo lost its history entry"
+    for shard in reloaded.shards.values():
+        shard.session = None
+    assert reloaded.undo_last_action() == True
+    assert "MATH201" not in reloaded.search_student("S003").subjects_enrolled
+    print("✓ Undo tests passed")
+
+    print("\nTest 3b: Bulk operations span shards")
+    report = reloaded.enroll_many(["S001", "S002", "S003", "S999"], "BIO101")
+    assert [r['success'] for r in report] == [True, True, True, False]
+    assert reloaded.undo_last_action() == True
+    assert not any("BIO101" in s.subjects_enrolled for s in reloaded.list_all_students())
+    print("✓ Bulk operation tests passed")
+
+    print("\nTest 4: Cohort partitioning")
+    cohort = ShardedStudentManager("test_cohort.txt", partition="cohort", prefix_length=4)
+    assert cohort.add_student(Student("AP22001", "A"))
+    assert cohort.add_student(Student("AP23001", "B"))
+    assert sorted(cohort.shards) == ["AP22", "AP23"]
+    report = cohort.complete_many([("ZZ99001", "MATH101", 50)])
+    assert report[0]['subject'] == "MATH101" and report[0]['mark'] == 50, \
+        "Missing-shard row lacks the shard report fields"
+    assert cohort.enroll_many(["ZZ99001"], "MATH101")[0]['subject'] == "MATH101"
+    assert sorted(ShardedStudentManager("test_cohort.txt", partition="cohort",
+                                        prefix_length=4).shards) == ["AP22", "AP23"]
+    print("✓ Cohort partitioning tests passed")
+
+    print("\nTest 5: Importing a flat file")
+    with open("test_sharded.import.txt", 'w') as f:
+        f.write("AP22001,Duplicate\nAP24001,New One\nAP24001,Repeated\nBX01001,Other\n")
+    assert cohort.import_file("test_sharded.import.txt") == 2
+    assert cohort.search_student("AP24001").student_name == "New One"
+    assert cohort.search_student("AP22001").student_name == "A", "Import replaced a record"
+    assert cohort.undo_last_action() == True
+    assert cohort.search_student("AP24001") is None and cohort.search_student("BX01001") is None
+    assert cohort.search_student("AP22001") is not None, "Undo removed an existing record"
+    print("✓ Import tests passed")
+
+    for path in glob.glob("test_sharded.*") + glob.glob("test_cohort.*"):
+        os.remove(path)
+    if os.path.exists("backups"):
+        shutil.rmtree("backups")
+
+    print("\n" + "=" * 50)
+    print("All unit tests passed successfully! ✓")
@@ -1,9 +1,41 @@
 import os
 import json
+import base64
+import locale
+import bisect
+import threading
+import functools
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Callable
 import shutil
 
+from auth import Session, VIEW, ADD_STUDENT, REMOVE_STUDENT, ENROLL, COMPLETE, UNDO
+
+# Marks have no per-subject credit weighting, so every passed subject earns the same
+PASS_MARK = 40
+CREDITS_PER_SUBJECT = 3
+
+# Change event types delivered to StudentManager subscribers
+STUDENT_ADDED = 'student_added'
+STUDENT_REMOVED = 'student_removed'
+STUDENT_UPDATED = 'student_updated'  # Changed outside this process
+ENROLLED = 'enrolled'
+COMPLETED = 'completed'
+UNDONE = 'undone'
+RELOADED = 'reloaded'  # Too much changed to describe per student
+
+# Sort orders for list_students; ties are always broken by student ID
+SORT_KEYS = {
+    'id': lambda student: student.student_id,
+    'name': lambda student: student.student_name.casefold(),
+    'average': lambda student: -1.0 if student.average_mark is None else student.average_mark,
+    'completed': lambda student: student.completed_count
+}
+# What a decoded cursor key must be for each sort, so bisect never compares across types
+_SORT_KEY_TYPES = {'id': str, 'name': str, 'average': (int, float), 'completed': int}
+
 
 class Student:
 
@@ -17,14 +49,64 @@ class Student:
         self.subjects_enrolled = subjects_enrolled if subjects_enrolled else []
         self.subjects_completed = subjects_completed if subjects_completed else []
         self.subjects_marks = subjects_marks if subjects_marks else []
+        self._line: Optional[str] = None  # Cached to_string() result
+        self._derived: Optional[Dict] = None  # Cached marks/counts, see _derive()
+
+    def mark_dirty(self) -> None:
+
+        # Must follow any change to the subject lists so the caches are rebuilt
+        self._line = None
+        self._derived = None
+
+    def _derive(self) -> Dict:
+
+        if self._derived is None:
+            marks = self.subjects_marks
+            self._derived = {
+                'average_mark': sum(marks) / len(marks) if marks else None,
+                'best_mark': max(marks) if marks else None,
+                'worst_mark': min(marks) if marks else None,
+                'enrolled_count': len(self.subjects_enrolled),
+                'completed_count': len(self.subjects_completed),
+                'credits': CREDITS_PER_SUBJECT * sum(1 for mark in marks if mark >= PASS_MARK)
+            }
+        return self._derived
+
+    @property
+    def average_mark(self) -> Optional[float]:
+        return self._derive()['average_mark']
+
+    @property
+    def best_mark(self) -> Optional[int]:
+        return self._derive()['best_mark']
+
+    @property
+    def worst_mark(self) -> Optional[int]:
+        return self._derive()['worst_mark']
+
+    @property
+    def enrolled_count(self) -> int:
+        return self._derive()['enrolled_count']
+
+    @property
+    def completed_count(self) -> int:
+        return self._derive()['completed_count']
+
+    @property
+    def credits(self) -> int:
+        return self._derive()['credits']
 
     def to_string(self) -> str:
 
+        if self._line is not None:
+            return self._line
+
         enrolled_str = ";".join(self.subjects_enrolled) if self.subjects_enrolled else ""
         completed_str = ";".join(self.subjects_completed) if self.subjects_completed else ""
         marks_str = ";".join(map(str, self.subjects_marks)) if self.subjects_marks else ""
 
-        return f"{self.student_id},{self.student_name},{enrolled_str},{completed_str},{marks_str}"
+        self._line = f"{self.student_id},{self.student_name},{enrolled_str},{completed_str},{marks_str}"
+        return self._line
 
     @staticmethod
     def from_string(line: str) -> 'Student':
@@ -51,18 +133,271 @@ class Student:
         return Student(student_id, student_name, subjects_enrolled,
                        subjects_completed, subjects_marks)
 
+    def __reduce__(self):
+        # Pickle as constructor arguments; report batches are sent to worker
+        # processes and this is much cheaper than the default __dict__
+        return (Student, (self.student_id, self.student_name, self.subjects_enrolled,
+                          self.subjects_completed, self.subjects_marks))
+
     def __str__(self) -> str:
         return (f"ID: {self.student_id} | Name: {self.student_name} | "
                 f"Enrolled: {', '.join(self.subjects_enrolled) if self.subjects_enrolled else 'None'} | "
                 f"Completed: {', '.join(self.subjects_completed) if self.subjects_completed else 'None'}")
 
 
-class StudentManager:
+def _parse_records(filename: str, encoding: str) -> Tuple[List[Student], List[int], List[str],
+                                                            bool, Tuple[int, int]]:
+
+    # Always serial. Parsing was once split across worker processes, but
+    # shipping the parsed records back cost as much as parsing them (8.4s
+    # against 9.2s for 800k records), so no core count could make it faster
+    students = []
+    offsets = []  # Byte offset of each parsed record, for incremental saves
+    warnings = []
+
+    with open(filename, 'rb') as f:
+        before = os.fstat(f.fileno())
+        data = f.read()
+    # Appends are written in place, so a read can catch one halfway through;
+    # refuse it and let the caller retry rather than adopt a partial roster
+    stamp = (before.st_mtime_ns, before.st_size)
+    after = os.stat(filename)
+    if len(data) != before.st_size or (after.st_mtime_ns, after.st_size) != stamp:
+        raise OSError(f"{filename} changed while it was being read")
+    if not data:
+        return students, offsets, warnings, True, stamp
+    raw_lines = data.split(b'\n')
+
+    # Canonical means the file is exactly one to_string line per record, so
+    # the offsets can be trusted to rewrite only the tail of the file
+    canonical = raw_lines[-1] == b''
+    if canonical:
+        raw_lines.pop()
+
+    offset = 0
+    for raw_line in raw_lines:
+        line_start = offset
+        offset += len(raw_line) + 1
+        line = raw_line.decode(encoding)
+        stripped = line.strip()
+        if stripped != line or not stripped:
+            canonical = False
+        if stripped:  # Skip empty lines
+            try:
+                student = Student.from_string(stripped)
+            except ValueError as e:
+                warnings.append(f"Warning: Skipping invalid record - {e}")
+                canonical = False
+                continue
+            # Lines that would be written differently (spacing, extra fields)
+            # make the file non-canonical so the next save rewrites them
+            if student.to_string() != stripped:
+                canonical = False
+            students.append(student)
+            offsets.append(line_start)
+
+    return students, offsets, warnings, canonical, stamp
+
+
+def encode_cursor(sort: str, key, student_id: str) -> str:
+
+    payload = json.dumps([sort, key, student_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple:
+
+    try:
+        cursor_sort, key, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort {cursor_sort!r}, not {sort!r}")
+    if not isinstance(student_id, str) or not isinstance(key, _SORT_KEY_TYPES[sort]):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key, student_id
+
+
+def page_entries(entries: List[Tuple], after: Optional[str], limit: int, descending: bool,
+                 sort: str) -> Tuple[List[Tuple], Optional[str]]:
+
+    # entries are sorted (key, student_id, ...) tuples; the cursor is the
+    # sort name and (key, student_id) of the last entry on the previous page
+    if limit < 1:
+        raise ValueError(f"Page limit must be at least 1, got {limit}")
+    boundary = None if after is None else decode_cursor(after, sort)
+    if descending:
+        end = len(entries) if boundary is None else bisect.bisect_left(entries, boundary)
+        page = entries[max(end - limit, 0):end][::-1]
+        more = end - limit > 0
+    else:
+        start = 0 if boundary is None else bisect.bisect_right(entries, boundary)
+        page = entries[start:start + limit]
+        more = start + limit < len(entries)
+
+    next_cursor = encode_cursor(sort, page[-1][0], page[-1][1]) if page and more else None
+    return page, next_cursor
+
+
+class ChangeEvent:
+
+    def __init__(self, event_type: str, student_id: Optional[str], data=None,
+                 source: str = "local"):
+
+        self.event_type = event_type
+        self.student_id = student_id
+        self.data = data
+        self.source = source  # "local" or "external" for edits found by file watching
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.event_type!r}, {self.student_id!r}, source={self.source!r})"
+
+
+def _locked(method):
+
+    # Serialises manager methods against the file-watching thread's reloads
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _check_session(session: Optional[Session], permission: str) -> bool:
+
+    if session is None:
+        return True
+    if session.is_expired():
+        print("Error: Session has expired, please log in again")
+        return False
+    if not session.can(permission):
+        print(f"Error: Role {session.role} is not permitted to "
+              f"{permission.replace('_', ' ')}")
+        return False
+    session.touch()  # Expiry slides forward with each permitted action
+    return True
+
+
+class ChangeNotifier(ABC):
+
+    def __init__(self):
+
+        self._subscribers: Dict[int, Tuple[Callable, Optional[frozenset]]] = {}
+        self._next_token = 0
+        self._pending_events: List[ChangeEvent] = []
+        self._batch_depth = 0
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        self._watcher: Optional[threading.Event] = None
+        self._lock = threading.RLock()
+
+    def subscribe(self, callback: Callable[[List[ChangeEvent]], None],
+                  event_types: Optional[List[str]] = None) -> int:
+
+        self._next_token += 1
+        self._subscribers[self._next_token] = (callback,
+                                               frozenset(event_types) if event_types else None)
+        return self._next_token
+
+    def unsubscribe(self, token: int) -> bool:
+
+        return self._subscribers.pop(token, None) is not None
+
+    @contextmanager
+    def batch(self):
+
+        # Events raised inside the block reach subscribers as a single list
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            self._flush_events()
+
+    def _emit(self, event_type: str, student_id: Optional[str], data=None,
+              source: str = "local") -> None:
+
+        self._pending_events.append(ChangeEvent(event_type, student_id, data, source))
+
+    def _flush_events(self) -> None:
+
+        if self._batch_depth or not self._pending_events:
+            return
+
+        events = self._pending_events
+        self._pending_events = []
+        for callback, event_types in list(self._subscribers.values()):
+            wanted = events if event_types is None else \
+                [event for event in events if event.event_type in event_types]
+            if wanted:
+                try:
+                    callback(wanted)
+                except Exception as e:
+                    print(f"Warning: Change subscriber failed - {e}")
+
+    def _read_stamp(self) -> Optional[Tuple[int, int]]:
+
+        try:
+            stat = os.stat(self.filename)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def check_for_changes(self) -> bool:
+
+        with self._lock:
+            if self._read_stamp() == self._file_stamp:
+                return False
+            changed = self._reload_external()
+        # Subscribers run after the lock is released so they may call back in
+        self._flush_events()
+        return changed
+
+    @abstractmethod
+    def _reload_external(self) -> bool:
+
+        # Called under the lock once the data file has changed on disk; reloads
+        # it and queues events describing what changed
+        ...
+
+    def watch_file(self, interval: float = 1.0) -> None:
+
+        # Polls from a daemon thread, so subscribers are called on that thread;
+        # GUIs should call check_for_changes from their own event loop instead
+        if self._watcher is not None:
+            return
+        stop = threading.Event()
+        self._watcher = stop
 
-    def __init__(self, filename: str = "students.txt", auto_backup: bool = True):
+        def poll():
+            while not stop.wait(interval):
+                self.check_for_changes()
 
+        threading.Thread(target=poll, daemon=True).start()
+
+    def stop_watching(self) -> None:
+
+        if self._watcher is not None:
+            self._watcher.set()
+            self._watcher = None
+
+
+class StudentManager(ChangeNotifier):
+
+    def __init__(self, filename: str = "students.txt", auto_backup: bool = True,
+                 autoload: bool = True, session: Optional[Session] = None):
+
+        ChangeNotifier.__init__(self)
         self.filename = filename
+        self.session = session  # None means unrestricted, as for local scripts
         self.students: List[Student] = []
+        self.encoding = locale.getpreferredencoding(False)
+        self._offsets: List[int] = []  # Byte offset of each saved record
+        self._file_size = 0
+        self._dirty_from: Optional[int] = None  # First record index to rewrite
+        # Sorted (key, student_id) lists per sort order, built on first use and
+        # then kept in step with each mutation instead of being re-sorted
+        self._sort_indexes: Dict[str, Tuple[List[Tuple], Dict[str, object]]] = {}
+        self._by_id: Optional[Dict[str, Student]] = None
         self.action_history: List[Dict] = []  # Stack for undo functionality
         self.auto_backup = auto_backup
         self.backup_dir = "backups"
@@ -70,8 +405,10 @@ class StudentManager:
         if self.auto_backup and not os.path.exists(self.backup_dir):
             os.makedirs(self.backup_dir)
 
-        self.load_data()
+        if autoload:
+            self.load_data()
 
+    @_locked
     def load_data(self) -> bool:
 
         try:
@@ -79,22 +416,16 @@ class StudentManager:
                 # Create empty file if it doesn't exist
                 with open(self.filename, 'w') as f:
                     pass
+                self.students = []
+                self._offsets = []
+                self._file_size = 0
+                self._dirty_from = None
+                self._file_stamp = self._read_stamp()
+                self._drop_indexes()
                 print(f"Created new data file: {self.filename}")
                 return True
 
-            with open(self.filename, 'r') as f:
-                lines = f.readlines()
-                self.students = []
-
-                for line in lines:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            student = Student.from_string(line)
-                            self.students.append(student)
-                        except ValueError as e:
-                            print(f"Warning: Skipping invalid record - {e}")
-
+            self._adopt(_parse_records(self.filename, self.encoding))
             print(f"Loaded {len(self.students)} student records from {self.filename}")
             return True
 
@@ -102,71 +433,209 @@ class StudentManager:
             print(f"Error loading data: {e}")
             return False
 
+    def _adopt(self, result: Tuple) -> None:
+
+        students, offsets, warnings, canonical, stamp = result
+        for warning in warnings:
+            print(warning)
+        self.students = students
+        self._offsets = offsets
+
+        # The stamp of what was actually read, so a change made since is
+        # still seen by the next check_for_changes
+        self._file_stamp = stamp
+        self._file_size = stamp[1]
+        # A file with blank or invalid lines is normalised on the next save
+        self._dirty_from = None if canonical else 0
+        self._drop_indexes()
+
+    @_locked
     def save_data(self) -> bool:
 
-        try:
-            if self.auto_backup and os.path.exists(self.filename):
-                self._create_backup()
+        # Callers may have edited records directly, so nothing cached is
+        # trusted here: every record is re-serialized and the file rewritten
+        for student in self.students:
+            student.mark_dirty()
+        self._drop_indexes()
+        self._dirty_from = 0
+        return self._save_changes()
 
-            with open(self.filename, 'w') as f:
-                for student in self.students:
-                    f.write(student.to_string() + '\n')
+    def _save_changes(self) -> bool:
 
+        temp_filename = self.filename + ".saving"
+        try:
+            start = len(self.students) if self._dirty_from is None else self._dirty_from
+            # Anything else touching the file invalidates the offset index
+            stamp = self._read_stamp()
+            if stamp is None or stamp != self._file_stamp or stamp[1] != self._file_size:
+                start = 0
+            if start == 0:
+                offset = 0
+            else:
+                offset = self._offsets[start] if start < len(self._offsets) else self._file_size
+
+            # Records before the first change recorded by _mark_changed are not
+            # re-serialized. Only a pure append is written in place; any other
+            # change publishes a complete new file with os.replace, so readers
+            # never see a half-written roster, and that still copies the whole
+            # file. Appends are the only save that stays cheap on a large file
+            appending = start > 0 and offset == self._file_size
+            if self.auto_backup and os.path.exists(self.filename):
+                # A replaced file is never written again, so it can be linked
+                self._create_backup(link=not appending)
+
+            del self._offsets[start:]
+            chunks = []
+            position = offset
+            for student in self.students[start:]:
+                data = (student.to_string() + '\n').encode(self.encoding)
+                self._offsets.append(position)
+                chunks.append(data)
+                position += len(data)
+
+            if appending:
+                with open(self.filename, 'r+b') as f:
+                    f.seek(offset)
+                    f.write(b''.join(chunks))
+            else:
+                head = b''
+                if offset:
+                    with open(self.filename, 'rb') as f:
+                        head = f.read(offset)
+                with open(temp_filename, 'wb') as f:
+                    f.write(head)
+                    f.write(b''.join(chunks))
+                os.replace(temp_filename, self.filename)
+
+            self._file_size = position
+            self._dirty_from = None
+            self._file_stamp = self._read_stamp()
             print(f"Saved {len(self.students)} student records to {self.filename}")
             return True
 
         except Exception as e:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
             print(f"Error saving data: {e}")
             return False
 
-    def _create_backup(self) -> None:
+    def _mark_changed(self, student: Optional[Student] = None, index: Optional[int] = None) -> None:
+
+        if student is not None:
+            student.mark_dirty()
+            if index is None:
+                index = self.students.index(student)
+        if index is not None and (self._dirty_from is None or index < self._dirty_from):
+            self._dirty_from = index
+
+    def _reload_external(self) -> bool:
+
+        previous = {student.student_id: student.to_string() for student in self.students}
+        if not self.load_data():
+            return False
+        # Undo entries refer to records that may no longer match the file
+        self.action_history = []
+
+        current = {}
+        for student in self.students:
+            current.setdefault(student.student_id, student.to_string())
+        for student_id, line in current.items():
+            if student_id not in previous:
+                self._emit(STUDENT_ADDED, student_id, source="external")
+            elif previous[student_id] != line:
+                self._emit(STUDENT_UPDATED, student_id, source="external")
+        for student_id in previous:
+            if student_id not in current:
+                self._emit(STUDENT_REMOVED, student_id, source="external")
+        return True
+
+    def _authorize(self, permission: str) -> bool:
+
+        return _check_session(self.session, permission)
+
+    def _create_backup(self, link: bool = False) -> None:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_filename = os.path.join(self.backup_dir,
                                            f"{os.path.splitext(self.filename)[0]}_{timestamp}.txt")
-            shutil.copy2(self.filename, backup_filename)
+            linked = False
+            if link:
+                try:
+                    os.link(self.filename, backup_filename)
+                    linked = True
+                except OSError:
+                    pass  # No hard links here, or a backup from this second exists
+            if not linked:
+                shutil.copy2(self.filename, backup_filename)
             print(f"Backup created: {backup_filename}")
         except Exception as e:
             print(f"Warning: Could not create backup - {e}")
 
+    @_locked
     def add_student(self, student: Student) -> bool:
 
-        if self.search_student(student.student_id):
+        if not self._authorize(ADD_STUDENT):
+            return False
+
+        if self._find(student.student_id):
             print(f"Error: Student ID {student.student_id} already exists")
             return False
 
         # Save state for undo
         self._save_state('add_student', student.student_id)
 
+        self._mark_changed(student, len(self.students))
         self.students.append(student)
-        self.save_data()  # Auto-save
+        self._reindex(student)
+        self._save_changes()  # Auto-save
+        self._emit(STUDENT_ADDED, student.student_id)
+        self._flush_events()
         print(f"Student {student.student_name} added successfully")
         return True
 
+    @_locked
     def remove_student(self, student_id: str) -> bool:
 
-        student = self.search_student(student_id)
+        if not self._authorize(REMOVE_STUDENT):
+            return False
+
+        student = self._find(student_id)
         if not student:
             print(f"Error: Student ID {student_id} not found")
             return False
 
         self._save_state('remove_student', student_id, student)
 
+        self._mark_changed(index=self.students.index(student))
         self.students.remove(student)
-        self.save_data()  # Auto-save
+        self._reindex(student, removed=True)
+        self._save_changes()  # Auto-save
+        self._emit(STUDENT_REMOVED, student_id)
+        self._flush_events()
         print(f"Student {student.student_name} removed successfully")
         return True
 
+    @_locked
     def search_student(self, student_id: str) -> Optional[Student]:
 
+        if not self._authorize(VIEW):
+            return None
+        return self._find(student_id)
+
+    def _find(self, student_id: str) -> Optional[Student]:
+
         for student in self.students:
             if student.student_id == student_id:
                 return student
         return None
 
+    @_locked
     def update_enrollment(self, student_id: str, subject: str) -> bool:
 
-        student = self.search_student(student_id)
+        if not self._authorize(ENROLL):
+            return False
+
+        student = self._find(student_id)
         if not student:
             print(f"Error: Student ID {student_id} not found")
             return False
@@ -183,13 +652,21 @@ class StudentManager:
                          {'subject': subject, 'action': 'add'})
 
         student.subjects_enrolled.append(subject)
-        self.save_data()  # Auto-save
+        self._mark_changed(student)
+        self._reindex(student)
+        self._save_changes()  # Auto-save
+        self._emit(ENROLLED, student_id, {'subject': subject})
+        self._flush_events()
         print(f"Student {student.student_name} enrolled in {subject}")
         return True
 
+    @_locked
     def mark_subject_completed(self, student_id: str, subject: str, mark: int) -> bool:
 
-        student = self.search_student(student_id)
+        if not self._authorize(COMPLETE):
+            return False
+
+        student = self._find(student_id)
         if not student:
             print(f"Error: Student ID {student_id} not found")
             return False
@@ -208,16 +685,223 @@ class StudentManager:
         student.subjects_enrolled.remove(subject)
         student.subjects_completed.append(subject)
         student.subjects_marks.append(mark)
-        self.save_data()  # Auto-save
+        self._mark_changed(student)
+        self._reindex(student)
+        self._save_changes()  # Auto-save
+        self._emit(COMPLETED, student_id, {'subject': subject, 'mark': mark})
+        self._flush_events()
         print(f"Subject {subject} marked as completed for {student.student_name} with mark {mark}")
         return True
 
+    def _positions(self) -> Dict[str, int]:
+
+        return {student.student_id: i for i, student in enumerate(self.students)}
+
+    @_locked
+    def enroll_many(self, student_ids: List[str], subject: str) -> List[Dict]:
+
+        if not self._authorize(ENROLL):
+            return [{'student_id': student_id, 'subject': subject, 'success': False,
+                     'message': "Permission denied"} for student_id in student_ids]
+
+        positions = self._positions()
+        report = []
+        valid = []
+        seen = set()
+
+        # Validate every item before touching any record
+        for student_id in student_ids:
+            result = {'student_id': student_id, 'subject': subject,
+                      'success': False, 'message': ''}
+            report.append(result)
+            position = positions.get(student_id)
+            if position is None:
+                result['message'] = f"Student ID {student_id} not found"
+            elif student_id in seen:
+                result['message'] = "Duplicate student ID in request"
+            elif subject in self.students[position].subjects_enrolled:
+                result['message'] = f"Already enrolled in {subject}"
+            elif subject in self.students[position].subjects_completed:
+                result['message'] = f"Already completed {subject}"
+            else:
+                valid.append((position, result))
+            seen.add(student_id)
+
+        if valid:
+            self._save_state('enroll_many', None,
+                             {'subject': subject,
+                              'student_ids': [result['student_id'] for _, result in valid]})
+            for position, result in valid:
+                student = self.students[position]
+                student.subjects_enrolled.append(subject)
+                self._mark_changed(student, position)
+                self._reindex(student)
+                result['success'] = True
+                result['message'] = f"Enrolled in {subject}"
+                self._emit(ENROLLED, student.student_id, {'subject': subject})
+            self._save_changes()  # Auto-save once for the whole batch
+            self._flush_events()
+
+        print(f"Enrolled {len(valid)} of {len(student_ids)} students in {subject}")
+        return report
+
+    @_locked
+    def complete_many(self, items: List[Tuple[str, str, int]]) -> List[Dict]:
+
+        if not self._authorize(COMPLETE):
+            return [{'student_id': student_id, 'subject': subject, 'mark': mark, 'success': False,
+                     'message': "Permission denied"} for student_id, subject, mark in items]
+
+        positions = self._positions()
+        report = []
+        valid = []
+        seen = set()
+
+        # Validate every item before touching any record
+        for student_id, subject, mark in items:
+            result = {'student_id': student_id, 'subject': subject, 'mark': mark,
+                      'success': False, 'message': ''}
+            report.append(result)
+            position = positions.get(student_id)
+            if position is None:
+                result['message'] = f"Student ID {student_id} not found"
+            elif (student_id, subject) in seen:
+                result['message'] = "Duplicate entry in request"
+            elif subject not in self.students[position].subjects_enrolled:
+                result['message'] = f"Not enrolled in {subject}"
+            elif not (0 <= mark <= 100):
+                result['message'] = "Mark must be between 0 and 100"
+            else:
+                valid.append((position, result))
+            seen.add((student_id, subject))
+
+        if valid:
+            self._save_state('complete_many', None,
+                             {'items': [(result['student_id'], result['subject'], result['mark'])
+                                        for _, result in valid]})
+            for position, result in valid:
+                student = self.students[position]
+                student.subjects_enrolled.remove(result['subject'])
+                student.subjects_completed.append(result['subject'])
+                student.subjects_marks.append(result['mark'])
+                self._mark_changed(student, position)
+                self._reindex(student)
+                result['success'] = True
+                result['message'] = f"Completed with mark {result['mark']}"
+                self._emit(COMPLETED, student.student_id,
+                           {'subject': result['subject'], 'mark': result['mark']})
+            self._save_changes()  # Auto-save once for the whole batch
+            self._flush_events()
+
+        print(f"Marked {len(valid)} of {len(items)} subjects as completed")
+        return report
+
+    @_locked
+    def add_many(self, students: List[Student]) -> List[Dict]:
+
+        if not self._authorize(ADD_STUDENT):
+            return [{'student_id': student.student_id, 'success': False,
+                     'message': "Permission denied"} for student in students]
+
+        positions = self._positions()
+        report = []
+        valid = []
+        seen = set()
+
+        # Validate every item before touching any record
+        for student in students:
+            result = {'student_id': student.student_id, 'success': False, 'message': ''}
+            report.append(result)
+            if student.student_id in positions:
+                result['message'] = f"Student ID {student.student_id} already exists"
+            elif student.student_id in seen:
+                result['message'] = "Duplicate student ID in request"
+            else:
+                valid.append((student, result))
+            seen.add(student.student_id)
+
+        if valid:
+            self._save_state('add_many', None,
+                             {'student_ids': [student.student_id for student, _ in valid]})
+            for student, result in valid:
+                self._mark_changed(student, len(self.students))
+                self.students.append(student)
+                self._reindex(student)
+                result['success'] = True
+                result['message'] = "Added"
+                self._emit(STUDENT_ADDED, student.student_id)
+            self._save_changes()  # Auto-save once for the whole batch
+            self._flush_events()
+
+        print(f"Added {len(valid)} of {len(students)} students")
+        return report
+
+    @_locked
     def list_all_students(self) -> List[Student]:
 
+        if not self._authorize(VIEW):
+            return []
         return self.students
 
+    @_locked
+    def list_students(self, after: Optional[str] = None, limit: int = 100, sort: str = "id",
+                      descending: bool = False) -> Tuple[List[Student], Optional[str]]:
+
+        if not self._authorize(VIEW):
+            return [], None
+        entries, _ = self._sort_index(sort)
+        page, next_cursor = page_entries(entries, after, limit, descending, sort)
+        by_id = self._student_map()
+        return [by_id[student_id] for _, student_id in page], next_cursor
+
+    def _sort_index(self, sort: str) -> Tuple[List[Tuple], Dict[str, object]]:
+
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        if sort not in self._sort_indexes:
+            key_of = SORT_KEYS[sort]
+            keys = {}
+            for student in self.students:
+                keys.setdefault(student.student_id, key_of(student))
+            entries = sorted((key, student_id) for student_id, key in keys.items())
+            self._sort_indexes[sort] = (entries, keys)
+        return self._sort_indexes[sort]
+
+    def _student_map(self) -> Dict[str, Student]:
+
+        if self._by_id is None:
+            self._by_id = {}
+            for student in self.students:
+                self._by_id.setdefault(student.student_id, student)
+        return self._by_id
+
+    def _reindex(self, student: Student, removed: bool = False) -> None:
+
+        student_id = student.student_id
+        if self._by_id is not None:
+            if not removed:
+                self._by_id.setdefault(student_id, student)
+            elif self._by_id.get(student_id) is student:
+                del self._by_id[student_id]
+
+        for sort, (entries, keys) in self._sort_indexes.items():
+            if student_id in keys:
+                del entries[bisect.bisect_left(entries, (keys.pop(student_id), student_id))]
+            if not removed:
+                keys[student_id] = SORT_KEYS[sort](student)
+                bisect.insort(entries, (keys[student_id], student_id))
+
+    def _drop_indexes(self) -> None:
+
+        self._sort_indexes = {}
+        self._by_id = None
+
+    @_locked
     def get_statistics(self) -> Dict:
 
+        if not self._authorize(VIEW):
+            return {}
         stats = {
             'total_students': len(self.students),
             'subjects_enrollment_count': {},
@@ -230,9 +914,8 @@ class StudentManager:
                     stats['subjects_enrollment_count'].get(subject, 0) + 1
 
         for student in self.students:
-            completed_count = len(student.subjects_completed)
             name = f"{student.student_name} ({student.student_id})"
-            stats['students_by_completed_count'][name] = completed_count
+            stats['students_by_completed_count'][name] = student.completed_count
 
         return stats
 
@@ -249,8 +932,12 @@ class StudentManager:
         if len(self.action_history) > 10:
             self.action_history.pop(0)
 
+    @_locked
     def undo_last_action(self) -> bool:
 
+        if not self._authorize(UNDO):
+            return False
+
         if not self.action_history:
             print("No actions to undo")
             return False
@@ -263,27 +950,30 @@ class StudentManager:
         try:
             if action_type == 'add_student':
                 # Remove the added student
-                student = self.search_student(student_id)
+                student = self._find(student_id)
                 if student:
+                    self._mark_changed(index=self.students.index(student))
                     self.students.remove(student)
                     print(f"Undid: Add student {student_id}")
 
             elif action_type == 'remove_student':
                 # Re-add the removed student
                 if data:
+                    self._mark_changed(index=len(self.students))
                     self.students.append(data)
                     print(f"Undid: Remove student {student_id}")
 
             elif action_type == 'update_enrollment':
                 # Remove the enrolled subject
-                student = self.search_student(student_id)
+                student = self._find(student_id)
                 if student and data['subject'] in student.subjects_enrolled:
                     student.subjects_enrolled.remove(data['subject'])
+                    self._mark_changed(student)
                     print(f"Undid: Enrollment in {data['subject']}")
 
             elif action_type == 'mark_completed':
                 # Move subject back to enrolled
-                student = self.search_student(student_id)
+                student = self._find(student_id)
                 if student:
                     subject = data['subject']
                     if subject in student.subjects_completed:
@@ -291,9 +981,58 @@ class StudentManager:
                         student.subjects_completed.pop(idx)
                         student.subjects_marks.pop(idx)
                         student.subjects_enrolled.append(subject)
+                        self._mark_changed(student)
                         print(f"Undid: Completion of {subject}")
 
-            self.save_data()
+            elif action_type == 'enroll_many':
+                positions = self._positions()
+                subject = data['subject']
+                for enrolled_id in data['student_ids']:
+                    position = positions.get(enrolled_id)
+                    if position is None:
+                        continue
+                    student = self.students[position]
+                    if subject in student.subjects_enrolled:
+                        student.subjects_enrolled.remove(subject)
+                        self._mark_changed(student, position)
+                print(f"Undid: Bulk enrollment in {subject}")
+
+            elif action_type == 'complete_many':
+                positions = self._positions()
+                for completed_id, subject, _ in data['items']:
+                    position = positions.get(completed_id)
+                    if position is None:
+                        continue
+                    student = self.students[position]
+                    if subject in student.subjects_completed:
+                        idx = student.subjects_completed.index(subject)
+                        student.subjects_completed.pop(idx)
+                        student.subjects_marks.pop(idx)
+                        student.subjects_enrolled.append(subject)
+                        self._mark_changed(student, position)
+                print(f"Undid: Bulk completion of {len(data['items'])} subjects")
+
+            elif action_type == 'add_many':
+                added = set(data['student_ids'])
+                for position in range(len(self.students) - 1, -1, -1):
+                    if self.students[position].student_id in added:
+                        self._mark_changed(index=position)
+                        del self.students[position]
+                print(f"Undid: Bulk addition of {len(added)} students")
+
+            if action_type in ('enroll_many', 'add_many'):
+                undone_ids = data['student_ids']
+            elif action_type == 'complete_many':
+                undone_ids = [item[0] for item in data['items']]
+            else:
+                undone_ids = [student_id]
+
+            # Undo is rare; rebuilding the sort indexes on next use is simpler
+            self._drop_indexes()
+            self._save_changes()
+            for undone_id in undone_ids:
+                self._emit(UNDONE, undone_id, {'action': action_type})
+            self._flush_events()
             return True
 
         except Exception as e:
@@ -303,6 +1042,8 @@ class StudentManager:
 
 # Unit Tests
 if __name__ == "__main__":
+    import time
+
     print("Running Unit Tests for StudentManager\n")
     print("=" * 50)
 
@@ -334,6 +1075,180 @@ if __name__ == "__main__":
     assert manager.mark_subject_completed("S001", "COMP101", 92) == False, "Marked non-enrolled subject"
     print("✓ Mark completed tests passed")
 
+    print("\nTest 4b: Testing cached derived fields")
+    found = manager.search_student("S001")
+    assert found.completed_count == 2 and found.enrolled_count == 2
+    assert found.average_mark == 88.5 and found.best_mark == 92 and found.worst_mark == 85
+    assert found.credits == 2 * CREDITS_PER_SUBJECT
+    assert found._derived is not None, "Derived fields were not cached"
+    manager.update_enrollment("S001", "HIST101")
+    assert found._derived is None, "Mutation did not invalidate derived fields"
+    assert found.enrolled_count == 3
+    manager.undo_last_action()
+    assert found.enrolled_count == 2
+    print("✓ Derived field tests passed")
+
+    print("\nTest 4c: Testing bulk enrollment and completion")
+    report = manager.enroll_many(["S001", "S002", "S999", "S002"], "BIO101")
+    assert [r['success'] for r in report] == [True, True, False, False], "Bad bulk report"
+    report = manager.complete_many([("S001", "BIO101", 70), ("S002", "BIO101", 101),
+                                    ("S002", "NOPE", 50)])
+    assert [r['success'] for r in report] == [True, False, False], "Bad bulk report"
+    assert manager.search_student("S001").subjects_marks[-1] == 70
+    assert manager.undo_last_action() and manager.undo_last_action()
+    assert "BIO101" not in manager.search_student("S001").subjects_enrolled + \
+        manager.search_student("S001").subjects_completed, "Bulk undo incomplete"
+    print("✓ Bulk operation tests passed")
+
+    print("\nTest 4d: Testing change events")
+    received = []
+    token = manager.subscribe(received.append)
+    manager.enroll_many(["S001", "S002"], "ART101")
+    assert [(e.event_type, e.student_id) for e in received[-1]] == \
+        [(ENROLLED, "S001"), (ENROLLED, "S002")], "Bulk events were not batched"
+    manager.undo_last_action()
+    assert {e.event_type for e in received[-1]} == {UNDONE}
+    with manager.batch():
+        manager.update_enrollment("S001", "ART101")
+        manager.update_enrollment("S002", "ART101")
+    assert len(received) == 3 and len(received[-1]) == 2, "batch() did not group events"
+    manager.undo_last_action()
+    manager.undo_last_action()
+    assert manager.check_for_changes() == False, "Own saves reported as external"
+    other = StudentManager("test_students.txt", auto_backup=False)
+    other.remove_student("S002")
+    other.add_student(Student("S003", "Outsider"))
+    os.utime("test_students.txt", ns=(0, 0))  # Same-size edits must still be seen
+    received.clear()
+    assert manager.check_for_changes() == True
+    assert sorted((e.event_type, e.student_id) for e in received[0]) == \
+        [(STUDENT_ADDED, "S003"), (STUDENT_REMOVED, "S002")], "Wrong external deltas"
+    assert all(e.source == "external" for e in received[0])
+    other.remove_student("S003")
+    other.add_student(Student("S002", "Jane Smith", ["COMP101", "CHEM101"]))
+    manager.check_for_changes()
+    assert manager.unsubscribe(token)
+    try:
+        ChangeNotifier()
+        assert False, "ChangeNotifier has no reload and should be abstract"
+    except TypeError:
+        pass
+    manager.watch_file(interval=0.001)  # Reloads race the edits below without the lock
+    for i in range(20):
+        other.update_enrollment("S002", f"EXT{i:03d}")
+        manager.update_enrollment("S001", f"LOC{i:03d}")
+    manager.stop_watching()
+    manager.check_for_changes()
+    with open("test_students.txt") as f:
+        assert f.read() == "".join(s.to_string() + "\n" for s in manager.students), \
+            "Watcher reload left the manager out of step with the file"
+    assert StudentManager("test_students.txt", auto_backup=False)._offsets == manager._offsets
+    for student_id, prefix in (("S001", "LOC"), ("S002", "EXT")):
+        student = manager.search_student(student_id)
+        student.subjects_enrolled = [s for s in student.subjects_enrolled
+                                     if not s.startswith(prefix)]
+    manager.save_data()
+    print("✓ Change event tests passed")
+
+    print("\nTest 4e: Testing role permissions")
+    viewer_session = Session("viewer", "Viewer")
+    teacher_session = Session("teacher", "Teacher")
+    restricted = StudentManager("test_students.txt", auto_backup=False, session=viewer_session)
+    assert restricted.update_enrollment("S001", "GEO101") == False, "Viewer changed a record"
+    assert restricted.undo_last_action() == False
+    assert not restricted.enroll_many(["S001"], "GEO101")[0]['success']
+    restricted.session = teacher_session
+    assert restricted.add_student(Student("S050", "Nope")) == False, "Teacher added a student"
+    assert restricted.remove_student("S001") == False, "Teacher removed a student"
+    teacher_session.expires_at = time.monotonic() + 5
+    assert restricted.update_enrollment("S001", "GEO101")
+    assert teacher_session.expires_at > time.monotonic() + 60, "Session not refreshed on use"
+    assert restricted.undo_last_action()
+    restricted.session = Session("admin", "Admin", ttl=0)
+    assert restricted.update_enrollment("S001", "GEO101") == False, "Expired session accepted"
+    assert restricted.search_student("S001") is None and restricted.list_all_students() == []
+    assert restricted.list_students() == ([], None) and restricted.get_statistics() == {}, \
+        "Expired session could still view records"
+    restricted.session = viewer_session
+    assert restricted.search_student("S001") is not None, "Viewer could not view records"
+    viewer_session.revoke()
+    assert restricted.search_student("S001") is None, "Logged-out session accepted"
+    restricted.session = None
+    print("✓ Permission tests passed")
+
+    print("\nTest 4f: Testing paginated listing")
+    paging = StudentManager("test_paging.txt", auto_backup=False)
+    for i in range(25):
+        paging.add_student(Student(f"P{i:03d}", f"Pupil {24 - i}", [], ["MATH101"], [50 + i]))
+    ids, cursor = [], None
+    while True:
+        page, cursor = paging.list_students(after=cursor, limit=10)
+        ids.extend(s.student_id for s in page)
+        if cursor is None:
+            break
+    assert ids == sorted(ids) and len(ids) == 25, "Pages skipped or repeated records"
+    page, cursor = paging.list_students(limit=3, sort="average", descending=True)
+    assert [s.student_id for s in page] == ["P024", "P023", "P022"]
+    paging.enroll_many(["P000"], "ART101")
+    paging.complete_many([("P000", "ART101", 100)])
+    page, _ = paging.list_students(after=cursor, limit=1, sort="average", descending=True)
+    assert page[0].student_id == "P021", "Cursor did not survive an index update"
+    assert paging.list_students(limit=1, sort="completed", descending=True)[0][0].student_id \
+        == "P000", "Index not updated after completion"
+    assert paging.list_students(limit=1, sort="name")[0][0].student_name == "Pupil 0"
+    name_cursor = paging.list_students(limit=1, sort="name")[1]
+    for bad in (name_cursor, encode_cursor("average", "Pupil 0", "P024"), "not-a-cursor"):
+        try:
+            paging.list_students(after=bad, sort="average")
+            assert False, f"Accepted cursor {bad}"
+        except ValueError:
+            pass
+    for bad_limit in (0, -1):
+        try:
+            paging.list_students(limit=bad_limit, descending=True)
+            assert False, f"Accepted limit {bad_limit}"
+        except ValueError:
+            pass
+    paging.remove_student("P024")
+    page, _ = paging.list_students(limit=2, sort="average", descending=True)
+    assert [s.student_id for s in page] == ["P000", "P023"], "Removal not reflected in index"
+    os.remove("test_paging.txt")
+    print("✓ Pagination tests passed")
+
+    print("\nTest 4g: Testing incremental saves")
+    assert manager._dirty_from is None, "Save left records marked dirty"
+    manager.update_enrollment("S002", "MATH201")
+    with open("test_students.txt") as f:
+        assert f.read() == "".join(s.to_string() + "\n" for s in manager.students), \
+            "Incremental save differs from a full rewrite"
+    reloaded = StudentManager("test_students.txt", auto_backup=False)
+    assert reloaded._offsets == manager._offsets, "Offset index out of sync with file"
+    with open("test_loose.txt", 'w') as f:
+        f.write("S1,A,,,85,extra\nS2,B,,C, 85\n")
+    loose = StudentManager("test_loose.txt", auto_backup=False)
+    assert loose._dirty_from == 0, "Non-canonical lines were trusted"
+    assert loose.save_data()
+    with open("test_loose.txt") as f:
+        assert f.read() == "S1,A,,,85\nS2,B,,C,85\n", "Save kept non-canonical lines"
+    os.remove("test_loose.txt")
+    edited = manager.search_student("S002")
+    edited.subjects_enrolled.append("ART101")  # Edited directly, without _mark_changed
+    assert manager.save_data()
+    assert "ART101" in StudentManager("test_students.txt", auto_backup=False) \
+        .search_student("S002").subjects_enrolled, "Direct edit was not saved"
+    assert edited.to_string().endswith("ART101,,") and edited.enrolled_count == 4, \
+        "Cached line or counts are stale after save_data"
+    edited.subjects_enrolled.remove("ART101")
+    assert manager.save_data()
+    with open("test_students.txt", 'rb') as held:  # Keeps the inode from being reused
+        inode = os.fstat(held.fileno()).st_ino
+        manager.add_student(Student("S009", "Appended"))
+        assert os.stat("test_students.txt").st_ino == inode, "Append was not written in place"
+        manager.remove_student("S009")
+        assert os.stat("test_students.txt").st_ino != inode, "Rewrite was not published atomically"
+    assert not os.path.exists("test_students.txt.saving"), "Temporary file left behind"
+    print("✓ Incremental save tests passed")
+
     print("\nTest 5: Testing statistics generation")
     stats = manager.get_statistics()
     assert stats['total_students'] == 2, "Wrong student count"
@@ -0,0 +1,95 @@
+import os
+import io
+import json
+import contextlib
+
+from student_manager import Student
+from integrity_check import (check_record, repair_record, scan, main, INVALID_RECORD,
+                             DUPLICATE_ID, MARK_COUNT_MISMATCH, MARK_OUT_OF_RANGE,
+                             ENROLLED_AND_COMPLETED)
+
+
+def _issues(report: str):
+    lines = [json.loads(line) for line in report.splitlines()]
+    return [(line['student_id'], line['issue']) for line in lines[:-1]], lines[-1]['summary']
+
+
+# Unit Tests
+if __name__ == "__main__":
+    print("Running Unit Tests for integrity_check\n")
+    print("=" * 50)
+
+    with open("test_integrity.txt", 'w') as f:
+        f.write("S001,John Doe,COMP101,PHYS101,85\n"
+                "broken\n"
+                "\n"
+                "S002,Jane Smith,,MATH101;PHYS101,70\n"
+                "S003,Bad Range,,MATH101,140\n"
+                "S004,Both Lists,MATH101,MATH101,60\n"
+                "S001,Second John,,,\n"
+                "S005,Bad Mark,,MATH101,abc\n")
+
+    print("\nTest 1: Each issue type is reported")
+    report = io.StringIO()
+    with open("test_integrity.txt", 'rb') as source:
+        summary = scan(source, report, encoding="utf-8")
+    issues, reported_summary = _issues(report.getvalue())
+    assert issues == [(None, INVALID_RECORD), ("S002", MARK_COUNT_MISMATCH),
+                      ("S003", MARK_OUT_OF_RANGE), ("S004", ENROLLED_AND_COMPLETED),
+                      ("S001", DUPLICATE_ID), (None, INVALID_RECORD)], f"Wrong issues: {issues}"
+    assert summary == reported_summary and summary['records'] == 7
+    assert summary['unique_ids'] == 4 and summary['issues'] == 6
+    assert json.loads(report.getvalue().splitlines()[0])['offset'] == \
+        len("S001,John Doe,COMP101,PHYS101,85\n"), "Wrong byte offset"
+    assert check_record(Student("S009", "Clean", ["COMP101"], ["MATH101"], [50])) == []
+    print("✓ Detection tests passed")
+
+    print("\nTest 2: Repair rules")
+    fixed = repair_record(Student("S002", "Jane", ["PHYS101", "ENG101"],
+                                  ["MATH101", "PHYS101", "CHEM101"], [-5, 120]))
+    assert fixed.subjects_completed == ["MATH101", "PHYS101"]
+    assert fixed.subjects_marks == [0, 100], "Marks were not clamped"
+    assert fixed.subjects_enrolled == ["ENG101", "CHEM101"], \
+        "Unmarked completion not moved back or completed subject left enrolled"
+    fixed = repair_record(Student("S003", "Extra", [], ["MATH101"], [60, 70]))
+    assert fixed.subjects_marks == [60], "Extra mark was kept"
+    print("✓ Repair rule tests passed")
+
+    print("\nTest 3: Exit codes and repaired copies")
+    with contextlib.redirect_stderr(io.StringIO()):
+        assert main(["test_integrity.txt", "--report", "test_integrity.jsonl",
+                     "--repair", "test_integrity_fixed.txt"]) == 1
+        assert main(["test_integrity_fixed.txt", "--report", "test_integrity.jsonl"]) == 0
+        assert main(["test_integrity_missing.txt"]) == 2
+    with open("test_integrity_fixed.txt") as f:
+        ids = [line.split(',')[0] for line in f]
+    assert ids == ["S001", "S002", "S003", "S004"], "Invalid or duplicate records were kept"
+    print("✓ Exit code tests passed")
+
+    print("\nTest 4: In-place repair keeps a backup")
+    with open("test_integrity.txt", 'rb') as f:
+        original = f.read()
+    backups_before = set(os.listdir("backups")) if os.path.isdir("backups") else set()
+    with contextlib.redirect_stderr(io.StringIO()):
+        assert main(["test_integrity.txt", "--report", "test_integrity.jsonl",
+                     "--in-place"]) == 1
+    new_backups = set(os.listdir("backups")) - backups_before
+    assert len(new_backups) == 1, "No backup was made"
+    backup = os.path.join("backups", new_backups.pop())
+    with open(backup, 'rb') as f:
+        assert f.read() == original, "Backup differs from the original file"
+    with open("test_integrity.txt", 'rb') as a, open("test_integrity_fixed.txt", 'rb') as b:
+        assert a.read() == b.read(), "In-place repair differs from the repaired copy"
+    assert not os.path.exists("test_integrity.txt.repairing"), "Temporary file left behind"
+    with contextlib.redirect_stderr(io.StringIO()):
+        assert main(["test_integrity.txt", "--report", "test_integrity.jsonl"]) == 0
+    print("✓ In-place repair tests passed")
+
+    os.remove(backup)
+    if not os.listdir("backups"):
+        os.rmdir("backups")
+    for name in ("test_integrity.txt", "test_integrity_fixed.txt", "test_integrity.jsonl"):
+        os.remove(name)
+
+    print("\n" + "=" * 50)
+    print("All unit tests passed successfully! ✓")